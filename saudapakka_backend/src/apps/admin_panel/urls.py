@@ -4,10 +4,15 @@ from .views import (
     AdminPropertyDetail, 
     AdminPropertyList, 
     AdminPropertyAction,
+    AdminPropertyBulkAction,
     AdminUserList,
     AdminUserAction,
     AdminUserDetail,
     AdminUserKYCVerify,
+    AdminPropertyExport,
+    AdminDuplicateDocuments,
+    AdminUserExport,
+    AdminMandateExport,
 )
 
 urlpatterns = [
@@ -16,14 +21,21 @@ urlpatterns = [
 
     # Property Management
     path('properties/', AdminPropertyList.as_view(), name='admin-prop-list'),
+    path('properties/export.<str:export_format>', AdminPropertyExport.as_view(), name='admin-prop-export'),
+    path('documents/duplicates/', AdminDuplicateDocuments.as_view(), name='admin-duplicate-documents'),
+    path('properties/bulk-action/', AdminPropertyBulkAction.as_view(), name='admin-prop-bulk-action'),
     path('properties/<uuid:pk>/action/', AdminPropertyAction.as_view(), name='admin-prop-action'),
 
     # User Management
     path('users/', AdminUserList.as_view(), name='admin-user-list'),
+    path('users/export.<str:export_format>', AdminUserExport.as_view(), name='admin-user-export'),
     path('users/<uuid:pk>/', AdminUserDetail.as_view(), name='admin-user-detail'),
     path('users/<uuid:pk>/action/', AdminUserAction.as_view(), name='admin-user-action'),
     path('users/<uuid:pk>/verify-kyc/', AdminUserKYCVerify.as_view(), name='admin-user-kyc-verify'),
 
+    # Mandates
+    path('mandates/export.<str:export_format>', AdminMandateExport.as_view(), name='admin-mandate-export'),
+
     # View Single Property (Details + Docs)
     path('properties/<uuid:pk>/', AdminPropertyDetail.as_view(), name='admin-prop-detail'),
 ]
\ No newline at end of file
@@ -1,17 +1,21 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, permissions, generics
+from rest_framework import status, permissions, generics, filters
 from django.contrib.auth import get_user_model
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
-from apps.properties.models import Property
+from apps.properties.models import LocalityPriceStats, Property, PropertyDuplicate, PropertyStats
+from apps.properties import media, moderation, saved_searches
 from apps.mandates.models import Mandate
-from django.db.models import Count, Avg, Q
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, Sum
+from django.db.models.functions import Coalesce, NullIf
 
 # Import models from other apps
 from apps.properties.models import Property
 from apps.users.models import BrokerProfile, KYCVerification
+from apps.mandates.views import MandateViewSet
+from . import exports
 
 User = get_user_model()
 
@@ -59,12 +63,28 @@ class AdminDashboardStats(APIView):
 
             # --- 4. Market Intelligence (For Frontend Charts) ---
             "market_insights": {
-                "avg_property_price": Property.objects.filter(verification_status='VERIFIED').aggregate(Avg('total_price'))['total_price__avg'] or 0,
-                "top_localities": Property.objects.values('locality').annotate(count=Count('id')).order_by('-count')[:5],
+                # From the LocalityPriceStats rollup instead of scanning every listing
+                "avg_property_price": LocalityPriceStats.objects.aggregate(
+                    avg=Sum('price_sum') / NullIf(Sum('count'), 0)
+                )['avg'] or 0,
+                "top_localities": LocalityPriceStats.objects.values('locality').annotate(count=Sum('count')).order_by('-count')[:5],
                 "inventory_by_bhk": Property.objects.values('bhk_config').annotate(count=Count('id')).order_by('bhk_config'),
             },
 
-            # --- 5. System Health ---
+            # --- 5. Engagement (last 30 days, from the daily PropertyStats) ---
+            "engagement": {
+                **PropertyStats.objects.filter(date__gte=last_30_days.date()).aggregate(
+                    views=Coalesce(Sum('views'), 0),
+                    saves=Coalesce(Sum('saves'), 0),
+                    contact_reveals=Coalesce(Sum('contact_reveals'), 0),
+                ),
+                "most_viewed": PropertyStats.objects.filter(date__gte=last_30_days.date())
+                    .values('property_id', 'property__title')
+                    .annotate(views=Sum('views'), contact_reveals=Sum('contact_reveals'))
+                    .order_by('-views')[:5],
+            },
+
+            # --- 6. System Health ---
             "platform_meta": {
                 "last_updated": now,
                 "server_time": now.strftime("%Y-%m-%d %H:%M:%S")
@@ -75,10 +95,18 @@ class AdminDashboardStats(APIView):
 # 2. PROPERTY VERIFICATION WORKFLOW
 # ==========================================
 
+def duplicate_flags_prefetch():
+    """The duplicate flags AdminPropertySerializer lists, in one query for all rows."""
+    return Prefetch('duplicate_flags', queryset=PropertyDuplicate.objects.select_related('duplicate_of').only(
+        'property_id', 'duplicate_of_id', 'score', 'components',
+        'duplicate_of__title', 'duplicate_of__verification_status',
+    ))
+
 class AdminPropertyList(generics.ListAPIView):
     """
-    List properties based on status.
-    Usage: /api/admin/properties/?status=PENDING
+    List properties based on status. Each row carries `possible_duplicates`;
+    ?duplicates=1 keeps only the flagged ones.
+    Usage: /api/admin/properties/?status=PENDING&duplicates=1
     """
     permission_classes = [permissions.IsAdminUser]
     # We need to import the serializer. We will do this in the serializers step.
@@ -90,7 +118,60 @@ class AdminPropertyList(generics.ListAPIView):
 
     def get_queryset(self):
         status_param = self.request.query_params.get('status', 'PENDING')
-        return Property.objects.filter(verification_status=status_param).order_by('-created_at')
+        queryset = Property.objects.for_listing().select_related('owner__kyc_data').prefetch_related(
+            duplicate_flags_prefetch()
+        ).filter(verification_status=status_param)
+        if self.request.query_params.get('duplicates') in ('1', 'true'):
+            queryset = queryset.filter(Exists(PropertyDuplicate.objects.filter(property=OuterRef('pk'))))
+        return queryset.order_by('-created_at')
+
+class AdminExportMixin:
+    """
+    Streams the view's filtered queryset as CSV or NDJSON instead of a JSON page.
+    Usage: /api/admin/<list>/export.csv?<same filters as the list>
+    """
+    export_name = None
+    export_fields = []
+
+    def get(self, request, export_format):
+        if export_format not in exports.CONTENT_TYPES:
+            return Response(
+                {"error": f"Unsupported export format. Use one of: {', '.join(exports.CONTENT_TYPES)}"},
+                status=400,
+            )
+        # Rows come from values(), so the serializer's prefetches are dead weight
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        return exports.stream_export(queryset, self.export_fields, export_format, self.export_name)
+
+
+class AdminPropertyExport(AdminExportMixin, AdminPropertyList):
+    """
+    Usage: /api/admin/properties/export.csv?status=VERIFIED
+    """
+    export_name = 'properties'
+    export_fields = [
+        'id', 'title', 'listing_type', 'property_type', 'sub_type', 'bhk_config',
+        'total_price', 'price_per_sqft', 'super_builtup_area', 'carpet_area', 'plot_area',
+        'project_name', 'locality', 'city', 'pincode', 'latitude', 'longitude',
+        'availability_status', 'furnishing_status', 'listed_by', 'verification_status',
+        'is_featured', 'owner__email', 'owner__phone_number', 'created_at',
+    ]
+
+class AdminDuplicateDocuments(APIView):
+    """
+    The same legal document (by SHA-256) attached to listings of different owners.
+    Usage: /api/admin/documents/duplicates/?limit=50
+           /api/admin/documents/duplicates/?sha256=<hash>   (every listing holding that document)
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 50)), 500)
+        except ValueError:
+            return Response({"error": "limit must be a number"}, status=400)
+        sha256 = request.query_params.get('sha256', '').lower() or None
+        return Response(media.duplicate_documents(sha256=sha256, limit=limit))
 
 class AdminPropertyAction(APIView):
     """
@@ -111,6 +192,7 @@ class AdminPropertyAction(APIView):
             property_obj.verification_status = 'VERIFIED'
             property_obj.rejection_reason = None
             property_obj.save()
+            saved_searches.match_in_background([property_obj.pk])
             return Response({"message": f"Property '{property_obj.title}' is now LIVE."})
 
         elif action == 'REJECT':
@@ -121,6 +203,30 @@ class AdminPropertyAction(APIView):
 
         return Response({"error": "Invalid action. Use APPROVE or REJECT"}, status=400)
 
+class AdminPropertyBulkAction(APIView):
+    """
+    Approve or Reject many properties at once, with one UPDATE for the batch.
+    Body: { "ids": ["<uuid>", ...], "action": "APPROVE" | "REJECT", "reason": "" }
+    Returns one result per id: approved, rejected, unchanged, not_found or invalid_id.
+    Usage: POST /api/admin/properties/bulk-action/
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        ids = request.data.get('ids')
+        action = request.data.get('action')
+        reason = request.data.get('reason', '')
+
+        if action not in moderation.ACTIONS:
+            return Response({"error": "Invalid action. Use APPROVE or REJECT"}, status=400)
+        if not isinstance(ids, list) or not ids:
+            return Response({"error": "Provide a non-empty list of ids."}, status=400)
+        if len(ids) > moderation.MAX_BATCH:
+            return Response({"error": f"At most {moderation.MAX_BATCH} ids per request."}, status=400)
+
+        results = moderation.moderate(ids, action, reason)
+        return Response({"results": results})
+
 # ==========================================
 # 3. USER MANAGEMENT (Brokers/Sellers)
 # ==========================================
@@ -150,6 +256,17 @@ class AdminUserList(generics.ListAPIView):
             
         return queryset
 
+class AdminUserExport(AdminExportMixin, AdminUserList):
+    """
+    Usage: /api/admin/users/export.ndjson?role=BROKER
+    """
+    export_name = 'users'
+    export_fields = [
+        'id', 'email', 'first_name', 'last_name', 'phone_number', 'role_category',
+        'is_active', 'is_active_seller', 'is_active_broker', 'is_kyc_verified',
+        'is_staff', 'date_joined', 'last_login',
+    ]
+
 class AdminUserAction(APIView):
     """
     Manage user state: BLOCK, UNBLOCK, UPDATE_ROLE
@@ -250,4 +367,34 @@ class AdminPropertyDetail(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAdminUser]
     from apps.properties.serializers import AdminPropertySerializer
     serializer_class = AdminPropertySerializer
-    queryset = Property.objects.all()
\ No newline at end of file
+
+    def get_queryset(self):
+        return Property.objects.for_listing().select_related('owner__kyc_data').prefetch_related(
+            duplicate_flags_prefetch()
+        )
+
+# ==========================================
+# 4. MANDATES
+# ==========================================
+
+class AdminMandateExport(AdminExportMixin, generics.GenericAPIView):
+    """
+    Export all mandates, optionally by status, with the mandate list's search.
+    Usage: /api/admin/mandates/export.csv?status=ACTIVE&search=SP-2024
+    """
+    permission_classes = [permissions.IsAdminUser]
+    filter_backends = [filters.SearchFilter]
+    search_fields = MandateViewSet.search_fields
+    export_name = 'mandates'
+    export_fields = [
+        'id', 'mandate_number', 'status', 'deal_type', 'initiated_by', 'is_exclusive',
+        'commission_rate', 'fixed_amount', 'property_item_id', 'property_item__title',
+        'seller__email', 'broker__email', 'created_at', 'signed_at', 'start_date', 'end_date',
+    ]
+
+    def get_queryset(self):
+        queryset = Mandate.objects.order_by('-created_at')
+        status_param = self.request.query_params.get('status')
+        if status_param:
+            queryset = queryset.filter(status=status_param)
+        return queryset
@@ -3,6 +3,9 @@ from datetime import timedelta
 from django.db import models
 from django.utils import timezone
 from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.properties.cache import bump_listing_generation_on_commit
 
 def get_acceptance_expiry():
     return timezone.now() + timedelta(days=7)
@@ -36,6 +39,8 @@ class Mandate(models.Model):
         ('TERMINATED', 'Terminated Early'),
         ('TERMINATED_BY_USER', 'Terminated by User')
     ]
+    # Statuses that count as the property's current mandate
+    OPEN_STATUSES = ['ACTIVE', 'PENDING']
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     
     created_at = models.DateTimeField(auto_now_add=True)
@@ -118,4 +123,10 @@ class Mandate(models.Model):
 
     def __str__(self):
         # Updated to use property_item
-        return f"Mandate: {self.mandate_number or self.id} - {self.status}"
\ No newline at end of file
+        return f"Mandate: {self.mandate_number or self.id} - {self.status}"
+
+@receiver(post_save, sender=Mandate)
+@receiver(post_delete, sender=Mandate)
+def invalidate_listing_cache(sender, instance, **kwargs):
+    """Listing responses carry has_active_mandate, so mandate changes retire them too."""
+    bump_listing_generation_on_commit()
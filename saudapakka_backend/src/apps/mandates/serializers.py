@@ -1,8 +1,8 @@
 from rest_framework import serializers
 from .models import Mandate
-from apps.properties.serializers import PropertySerializer
+from apps.properties.serializers import PropertySerializer, SparseFieldsetMixin
 
-class MandateSerializer(serializers.ModelSerializer):
+class MandateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # 1. Expand property details using the renamed source 'property_item'
     property_details = PropertySerializer(source='property_item', read_only=True)
     
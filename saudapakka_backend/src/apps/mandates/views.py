@@ -1,5 +1,5 @@
 from rest_framework import viewsets, permissions, status, filters, exceptions
-from django.db.models import Q
+from django.db.models import Q, Prefetch
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
@@ -8,6 +8,7 @@ from .serializers import MandateSerializer
 from rest_framework.exceptions import ValidationError
 from apps.notifications.models import Notification
 from apps.users.models import User
+from apps.properties.models import Property
 
 class MandateViewSet(viewsets.ModelViewSet):
     serializer_class = MandateSerializer
@@ -19,10 +20,15 @@ class MandateViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        # property_details nests a full PropertySerializer, so load it (with its
+        # active-mandate annotation) in one batch instead of per mandate
+        base_query = Mandate.objects.select_related('seller', 'broker').prefetch_related(
+            Prefetch('property_item', queryset=Property.objects.for_listing())
+        )
         if user.is_staff:
-            return Mandate.objects.all()
+            return base_query
             
-        return Mandate.objects.filter(
+        return base_query.filter(
             Q(seller=user) | Q(broker=user)
         ).distinct()
 
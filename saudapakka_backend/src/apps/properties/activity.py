@@ -0,0 +1,193 @@
+"""
+Write-behind buffering for high-volume user activity.
+
+Opening a property page must not cost a database write. Events are merged
+into a per-process WriteBehindBuffer and written in one batch every few
+seconds by a background thread, which is woken early when the buffer
+fills up. Two
+buffers use it: recent_views (RecentlyViewed) and property_counters
+(daily PropertyStats). Whatever is still buffered when the process exits
+is flushed by an atexit hook. A crash loses at most one interval of
+events, which is acceptable for view history and engagement counts.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+RECENTLY_VIEWED_LIMIT = getattr(settings, 'RECENTLY_VIEWED_LIMIT', 20)
+
+
+class WriteBehindBuffer:
+    """
+    Merges {key: value} events in memory and hands them to `flush(items)`
+    in batches. `merge(old, new)` combines two events for the same key.
+    """
+
+    def __init__(self, name, flush, merge, max_items=500, interval=5.0):
+        self.name = name
+        self._flush = flush
+        self._merge = merge
+        self.max_items = max_items
+        self.interval = interval
+        self._items = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._full = threading.Event()
+        self._pid = None
+
+    def add(self, key, value):
+        with self._lock:
+            self._ensure_worker()
+            if key in self._items:
+                value = self._merge(self._items[key], value)
+            self._items[key] = value
+            if len(self._items) >= self.max_items:
+                # Wakes the timer thread; setting an already set event is a no-op
+                self._full.set()
+
+    def flush(self):
+        """Writes out everything buffered so far. Returns the number of keys written."""
+        with self._flush_lock:
+            with self._lock:
+                items, self._items = self._items, {}
+            if not items:
+                return 0
+            try:
+                self._flush(items)
+            except Exception:
+                # Put the events back so the next flush retries them
+                with self._lock:
+                    for key, value in items.items():
+                        self._items[key] = self._merge(value, self._items[key]) if key in self._items else value
+                raise
+            return len(items)
+
+    def _ensure_worker(self):
+        # Started lazily so each forked gunicorn worker gets its own timer thread
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, daemon=True, name=f'{self.name}-flush').start()
+
+    def _run(self):
+        while True:
+            self._full.wait(self.interval)
+            self._full.clear()
+            self._flush_in_thread()
+
+    def _flush_in_thread(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Flushing the %s buffer failed", self.name)
+        finally:
+            connections.close_all()
+
+
+# --- Recently viewed ---
+
+def _flush_views(events):
+    """Upserts {(user_id, property_id): viewed_at} and trims each user's history."""
+    from apps.users.models import User
+    from .models import Property, RecentlyViewed
+
+    # Either side may have been deleted while the event sat in the buffer
+    property_ids = set(Property.objects.filter(pk__in={p for _, p in events}).values_list('pk', flat=True))
+    user_ids = set(User.objects.filter(pk__in={u for u, _ in events}).values_list('pk', flat=True))
+    rows = [
+        RecentlyViewed(user_id=user_id, property_id=property_id, viewed_at=viewed_at)
+        for (user_id, property_id), viewed_at in events.items()
+        if user_id in user_ids and property_id in property_ids
+    ]
+    if not rows:
+        return
+
+    with transaction.atomic():
+        RecentlyViewed.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['user', 'property'], update_fields=['viewed_at'],
+        )
+        trim_recently_viewed({row.user_id for row in rows})
+
+
+def trim_recently_viewed(user_ids, limit=RECENTLY_VIEWED_LIMIT):
+    """Keeps only the `limit` most recent views of each user."""
+    from .models import RecentlyViewed
+
+    ranked = RecentlyViewed.objects.filter(user_id__in=user_ids).annotate(
+        rank=Window(RowNumber(), partition_by=F('user_id'), order_by=[F('viewed_at').desc(), F('id').desc()])
+    )
+    RecentlyViewed.objects.filter(pk__in=ranked.filter(rank__gt=limit).values('pk')).delete()
+
+
+recent_views = WriteBehindBuffer('recent_views', _flush_views, merge=max)
+
+
+def record_view(user_id, property_id, viewed_at):
+    recent_views.add((user_id, property_id), viewed_at)
+
+
+# --- Engagement counters ---
+
+def _add(old, new):
+    return tuple(a + b for a, b in zip(old, new))
+
+
+def _flush_counters(counts):
+    """Adds {(property_id, date): (views, saves, contact_reveals)} onto PropertyStats."""
+    from .models import Property, PropertyStats
+
+    stats = PropertyStats._meta.db_table
+    columns = ', '.join(PropertyStats.COUNTER_FIELDS)
+    increments = ', '.join(f'{field} = {stats}.{field} + EXCLUDED.{field}' for field in PropertyStats.COUNTER_FIELDS)
+    row = '(%s::uuid, %s::date' + ', %s::integer' * len(PropertyStats.COUNTER_FIELDS) + ')'
+    params = [value for (property_id, date), totals in counts.items() for value in (property_id, date, *totals)]
+
+    # The join drops listings deleted while their counts sat in the buffer
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {stats} (property_id, date, {columns}) '
+            f'SELECT v.property_id, v.date, {", ".join(f"v.{field}" for field in PropertyStats.COUNTER_FIELDS)} '
+            f'FROM (VALUES {", ".join([row] * len(counts))}) AS v(property_id, date, {columns}) '
+            f'JOIN {Property._meta.db_table} p ON p.id = v.property_id '
+            f'ON CONFLICT (property_id, date) DO UPDATE SET {increments}',
+            params,
+        )
+
+
+property_counters = WriteBehindBuffer('property_counters', _flush_counters, merge=_add)
+
+
+def _count(property_id, index):
+    # Positions follow PropertyStats.COUNTER_FIELDS
+    increment = [0] * 3
+    increment[index] = 1
+    property_counters.add((property_id, timezone.localdate()), tuple(increment))
+
+
+def count_view(property_id):
+    _count(property_id, 0)
+
+
+def count_save(property_id):
+    _count(property_id, 1)
+
+
+def count_contact_reveal(property_id):
+    _count(property_id, 2)
+
+
+@atexit.register
+def _flush_on_exit():
+    for buffer in (recent_views, property_counters):
+        try:
+            buffer.flush()
+        except Exception:
+            logger.exception("Flushing the %s buffer at exit failed", buffer.name)
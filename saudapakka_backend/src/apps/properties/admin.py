@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Property, PropertyImage, PropertyFloorPlan, SavedProperty
+from .models import Property, PropertyImage, PropertyFloorPlan, PropertyImport, ChunkedUpload, MediaBlob, PendingFileDeletion, PropertyStats, PropertyDuplicate, LocalityPriceStats, SavedProperty, SavedSearch
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -22,6 +22,61 @@ class SavedPropertyAdmin(admin.ModelAdmin):
     readonly_fields = ['saved_at']
     date_hierarchy = 'saved_at'
 
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ['name', 'user', 'frequency', 'city', 'property_type', 'min_price', 'max_price', 'created_at']
+    list_filter = ['frequency']
+    search_fields = ['name', 'user__email', 'city']
+    readonly_fields = ['city', 'property_type', 'min_price', 'max_price', 'created_at']
+
+@admin.register(PropertyImport)
+class PropertyImportAdmin(admin.ModelAdmin):
+    list_display = ['source_name', 'owner', 'status', 'total_rows', 'created_count', 'created_at']
+    list_filter = ['status']
+    search_fields = ['source_name', 'owner__email']
+    readonly_fields = ['created_at', 'completed_at']
+
+@admin.register(ChunkedUpload)
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'owner', 'status', 'size', 'received', 'created_at']
+    list_filter = ['status']
+    search_fields = ['filename', 'owner__email']
+    readonly_fields = ['created_at', 'completed_at']
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'sha256', 'size', 'ref_count', 'created_at']
+    search_fields = ['name', 'sha256']
+    readonly_fields = ['name', 'sha256', 'size', 'ref_count', 'created_at']
+
+@admin.register(PendingFileDeletion)
+class PendingFileDeletionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'storage', 'attempts', 'next_attempt_at', 'created_at']
+    list_filter = ['storage']
+    search_fields = ['name']
+    readonly_fields = ['created_at']
+
+@admin.register(PropertyDuplicate)
+class PropertyDuplicateAdmin(admin.ModelAdmin):
+    list_display = ['property', 'duplicate_of', 'score', 'created_at']
+    search_fields = ['property__title', 'duplicate_of__title']
+    readonly_fields = ['property', 'duplicate_of', 'score', 'components', 'created_at']
+
+@admin.register(LocalityPriceStats)
+class LocalityPriceStatsAdmin(admin.ModelAdmin):
+    list_display = ['locality', 'city', 'property_type', 'listing_type', 'month', 'count']
+    list_filter = ['property_type', 'listing_type', 'city']
+    search_fields = ['locality', 'city']
+    exclude = ['price_histogram', 'ppsf_histogram']
+    readonly_fields = ['city', 'locality', 'property_type', 'listing_type', 'month', 'count', 'price_sum']
+
+@admin.register(PropertyStats)
+class PropertyStatsAdmin(admin.ModelAdmin):
+    list_display = ['property', 'date', 'views', 'saves', 'contact_reveals']
+    search_fields = ['property__title']
+    readonly_fields = ['property', 'date', 'views', 'saves', 'contact_reveals']
+    date_hierarchy = 'date'
+
 @admin.register(Property)
 class PropertyAdmin(admin.ModelAdmin):
     inlines = [PropertyImageInline, PropertyFloorPlanInline]
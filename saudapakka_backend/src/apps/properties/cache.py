@@ -0,0 +1,78 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+GENERATION_KEY = 'properties:listing_generation'
+
+
+def get_cache():
+    return caches[getattr(settings, 'PROPERTY_LIST_CACHE_ALIAS', 'default')]
+
+
+def new_generation():
+    # Random rather than a counter: after the key is culled, a counter would
+    # restart at a value whose entries may still be cached
+    return uuid.uuid4().hex
+
+
+def get_listing_generation():
+    """Current listing generation; every cached listing response is keyed under it."""
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = new_generation()
+        if not cache.add(GENERATION_KEY, generation, None):
+            # Another process added its own first
+            generation = cache.get(GENERATION_KEY, generation)
+    return generation
+
+
+def bump_listing_generation():
+    """
+    Invalidates every cached listing response in O(1) by moving to a new
+    generation. Old entries are never read again and simply expire.
+    """
+    get_cache().set(GENERATION_KEY, new_generation(), None)
+
+
+def bump_listing_generation_on_commit():
+    """Bumps after the surrounding transaction commits, so readers can't re-cache stale rows."""
+    transaction.on_commit(bump_listing_generation)
+
+
+def listing_cache_key(request, namespace):
+    """Cache key for a request: host + every query parameter, order-insensitive."""
+    params = sorted(
+        (key, tuple(sorted(request.query_params.getlist(key))))
+        for key in request.query_params
+    )
+    raw = f'{request.get_host()}|{request.path}|{params!r}'
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    return f'properties:{namespace}:{get_listing_generation()}:{digest}'
+
+
+def cached_listing_response(request, namespace, build_response):
+    """
+    Serves anonymous GETs of public listing data from the cache.
+
+    Authenticated users see their own unverified listings, so their
+    responses are always built fresh. `build_response` is only called on a
+    miss, and only 200 responses are stored.
+    """
+    if request.method != 'GET' or request.user.is_authenticated:
+        return build_response()
+
+    cache = get_cache()
+    key = listing_cache_key(request, namespace)
+    data = cache.get(key)
+    if data is not None:
+        return Response(data)
+
+    response = build_response()
+    if response.status_code == 200:
+        cache.set(key, response.data, getattr(settings, 'PROPERTY_LIST_CACHE_TIMEOUT', 300))
+    return response
@@ -0,0 +1,133 @@
+"""
+Deleting stored files off the request path.
+
+post_delete receivers call enqueue() instead of deleting files. The names
+queued during a transaction (per savepoint) are collected on the
+database connection, and a single on_commit callback inserts them as
+PendingFileDeletion rows and starts one background thread to remove the
+files. Deleting a listing with twelve documents and forty images, whose
+image rows go in the same cascade, costs one INSERT and one thread. A
+rolled-back delete queues nothing; files left behind by a crash between
+the commit and the INSERT show up in `reap_deleted_files --orphans`.
+
+Failed jobs stay queued with exponential backoff. `manage.py
+reap_deleted_files` retries them, reports jobs that keep failing, and
+lists orphaned files (stored, but referenced by no row) with --orphans.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import media
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 8
+
+STORAGES = {
+    'default': default_storage,
+    'documents': media.document_storage,
+}
+
+
+class _Batch(dict):
+    """{storage: {name: None}} queued in one transaction; the on_commit callback that queues them."""
+
+    def __call__(self):
+        from .models import PendingFileDeletion
+
+        PendingFileDeletion.objects.bulk_create([
+            PendingFileDeletion(name=name, storage=storage)
+            for storage, names in self.items() for name in names
+        ])
+        process_in_background()
+
+
+def enqueue(names, storage='default'):
+    """Schedules the stored files `names` for deletion once the transaction commits."""
+    names = [name for name in names if name]
+    if not names:
+        return
+
+    connection = transaction.get_connection()
+    batches = connection.__dict__.setdefault('pending_file_deletions', {})
+    key = tuple(connection.savepoint_ids)
+    batch = batches.get(key)
+    # A batch whose callback already ran, or was dropped by a rollback, is done with
+    fresh = batch is None or not any(func is batch for _, func, _ in connection.run_on_commit)
+    if fresh:
+        batch = batches[key] = _Batch()
+    batch.setdefault(storage, {}).update(dict.fromkeys(names))
+    if fresh:
+        # Outside a transaction this runs right away
+        transaction.on_commit(batch)
+
+
+def delete_file(job):
+    """Removes one queued file. Content-addressed documents re-used since are kept."""
+    from .models import MediaBlob
+
+    storage = STORAGES[job.storage]
+    if job.storage != 'documents':
+        storage.delete(job.name)
+        return
+
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=job.name).first()
+        if blob is not None and blob.ref_count > 0:
+            return
+        storage.delete(job.name)
+        if blob is not None:
+            blob.delete()
+
+
+def process(limit=None):
+    """Works through the due jobs; returns (deleted, failed)."""
+    from .models import PendingFileDeletion
+
+    deleted = failed = 0
+    while limit is None or deleted + failed < limit:
+        with transaction.atomic():
+            # skip_locked lets several workers drain the queue side by side
+            batch = list(
+                PendingFileDeletion.objects.select_for_update(skip_locked=True)
+                .filter(attempts__lt=MAX_ATTEMPTS, next_attempt_at__lte=timezone.now())
+                .order_by('id')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+
+            done = []
+            for job in batch:
+                try:
+                    delete_file(job)
+                except Exception as exc:
+                    job.attempts += 1
+                    job.last_error = str(exc)[:500]
+                    job.next_attempt_at = timezone.now() + timedelta(minutes=2 ** job.attempts)
+                    job.save(update_fields=['attempts', 'last_error', 'next_attempt_at'])
+                    failed += 1
+                else:
+                    done.append(job.pk)
+            PendingFileDeletion.objects.filter(pk__in=done).delete()
+            deleted += len(done)
+    return deleted, failed
+
+
+def process_in_background():
+    threading.Thread(target=_process_job, daemon=True).start()
+
+
+def _process_job():
+    try:
+        process()
+    except Exception:
+        # The jobs stay queued; `reap_deleted_files` retries them
+        logger.exception("Processing queued file deletions failed")
+    finally:
+        connections.close_all()
@@ -0,0 +1,242 @@
+"""
+Duplicate and near-duplicate listing detection.
+
+The same plot is often listed by its owner and by several brokers, with
+titles and addresses that differ slightly. Each listing carries two
+derived columns computed in Property.save():
+- dedupe_signature: a MinHash of the character shingles of its normalized
+  address (project, address line, locality).
+- dedupe_bands: the signature cut into LSH bands, one hash per band.
+Listings whose addresses overlap strongly share at least one band. The
+candidates are therefore found by a GIN-indexed array overlap, plus a
+separate geohash prefix scan for listings within a few hundred metres. Each candidate
+is then scored on address similarity, distance, price and area, and those
+at or above FLAG_THRESHOLD are stored as PropertyDuplicate flags for the
+admin verification queue. Addresses naming different plot / flat numbers
+are never flagged, so the plots of one layout don't flag each other.
+Each flagged pair is stored in both directions.
+"""
+import hashlib
+import math
+import random
+import re
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from . import geo
+
+NUM_PERMUTATIONS = 64
+BAND_ROWS = 4  # 16 bands: pairs above ~0.5 address similarity usually share one
+SHINGLE_SIZE = 4
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Distance score: 1 within NEARBY_METRES, falling to 0 at FAR_METRES
+NEARBY_METRES = 100
+FAR_METRES = 500
+
+FLAG_THRESHOLD = 0.75
+MAX_CANDIDATES = 50  # per branch: address-band hits, nearby listings
+
+# Weights of the score components; missing components are left out
+WEIGHTS = {'address': 0.5, 'distance': 0.3, 'price': 0.1, 'area': 0.1}
+
+# Columns the signature is built from
+SOURCE_FIELDS = {'project_name', 'address_line', 'locality'}
+# Columns whose change re-runs detection
+SCORED_FIELDS = SOURCE_FIELDS | {
+    'latitude', 'longitude', 'total_price', 'super_builtup_area', 'carpet_area', 'plot_area',
+    'property_type', 'listing_type',
+}
+
+ABBREVIATIONS = {
+    'rd': 'road', 'st': 'street', 'nr': 'near', 'opp': 'opposite', 'sec': 'sector',
+    'soc': 'society', 'apt': 'apartment', 'apts': 'apartments', 'bldg': 'building',
+    'chs': 'society', 'ngr': 'nagar', 'mkt': 'market',
+}
+NOISE_WORDS = {'no', 'number', 'plot', 'flat', 'the', 'at', 'post', 'tal', 'dist'}
+
+_rng = random.Random(20240229)
+_PERMUTATIONS = [
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def normalize_address(*parts):
+    """Lower-cased words of the address, abbreviations expanded and filler dropped."""
+    words = re.findall(r'[a-z0-9]+', ' '.join(p for p in parts if p).lower())
+    words = [ABBREVIATIONS.get(word, word) for word in words]
+    return ' '.join(word for word in words if word not in NOISE_WORDS)
+
+
+def shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+def minhash(tokens):
+    """NUM_PERMUTATIONS minimum hash values of a set of shingles, or [] for an empty set."""
+    hashes = [_hash64(token) for token in tokens]
+    if not hashes:
+        return []
+    return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def lsh_bands(signature):
+    """One signed 64-bit hash per band of BAND_ROWS signature values."""
+    bands = []
+    for start in range(0, len(signature), BAND_ROWS):
+        key = f"{start}:{','.join(map(str, signature[start:start + BAND_ROWS]))}"
+        bands.append(int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big', signed=True))
+    return bands
+
+
+def build_signature(prop):
+    """(dedupe_signature, dedupe_bands) for a Property instance."""
+    signature = minhash(shingles(normalize_address(prop.project_name, prop.address_line, prop.locality)))
+    return signature, lsh_bands(signature)
+
+
+def address_similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    if not a or not b:
+        return None
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def distance_metres(a, b):
+    if None in (a.latitude, a.longitude, b.latitude, b.longitude):
+        return None
+    lat1, lat2 = math.radians(a.latitude), math.radians(b.latitude)
+    dlat = lat2 - lat1
+    dlng = math.radians(b.longitude - a.longitude)
+    h = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng / 2) ** 2
+    return 2 * geo.EARTH_RADIUS_KM * 1000 * math.asin(math.sqrt(h))
+
+
+def _ratio(a, b):
+    if not a or not b:
+        return None
+    a, b = float(a), float(b)
+    return min(a, b) / max(a, b)
+
+
+def _area(prop):
+    return prop.super_builtup_area or prop.carpet_area or prop.plot_area
+
+
+def unit_numbers(prop):
+    """Plot / flat / survey numbers in the address, pincodes left out."""
+    text = normalize_address(prop.project_name, prop.address_line, prop.locality)
+    return {word for word in text.split() if word.isdigit() and len(word) != 6}
+
+
+def distinct_units(a, b):
+    """
+    True when the addresses name different units, e.g. plots 12 and 13 of one
+    layout: almost the same text and place, but not the same property.
+    """
+    ours, theirs = unit_numbers(a), unit_numbers(b)
+    return bool(ours and theirs) and not (ours <= theirs or theirs <= ours)
+
+
+def score(a, b):
+    """(score 0..1, {component: similarity}) for two listings of the same type."""
+    if distinct_units(a, b):
+        return 0.0, {}
+    components = {'address': address_similarity(a.dedupe_signature, b.dedupe_signature)}
+    metres = distance_metres(a, b)
+    if metres is not None:
+        components['distance'] = max(0.0, min(1.0, (FAR_METRES - metres) / (FAR_METRES - NEARBY_METRES)))
+    components['price'] = _ratio(a.total_price, b.total_price)
+    components['area'] = _ratio(_area(a), _area(b))
+
+    components = {name: value for name, value in components.items() if value is not None}
+    total = sum(WEIGHTS[name] for name in components)
+    if not total:
+        return 0.0, components
+    return sum(WEIGHTS[name] * value for name, value in components.items()) / total, components
+
+
+def candidates(prop):
+    """
+    Other listings of the same kind that share an address band or lie within
+    FAR_METRES: the band hits with the most shared bands first, then the
+    nearest of the rest. The two are capped separately, so a crowd of nearby
+    listings can't push an address match out.
+    """
+    from .models import Property
+
+    same_kind = Property.objects.filter(
+        property_type=prop.property_type, listing_type=prop.listing_type,
+    ).exclude(pk=prop.pk).exclude(verification_status='REJECTED').defer('embedding', 'search_vector')
+
+    found = []
+    if prop.dedupe_bands:
+        shared_bands = RawSQL(
+            f'cardinality(ARRAY(SELECT unnest({Property._meta.db_table}.dedupe_bands) '
+            f'INTERSECT SELECT unnest(%s::bigint[])))',
+            [prop.dedupe_bands],
+        )
+        found = list(
+            same_kind.filter(dedupe_bands__overlap=prop.dedupe_bands)
+            .annotate(shared_bands=shared_bands)
+            .order_by('-shared_bands', '-created_at')[:MAX_CANDIDATES]
+        )
+
+    if prop.latitude is not None and prop.longitude is not None:
+        radius_km = FAR_METRES / 1000
+        cells = Q()
+        for prefix in geo.covering_prefixes(prop.latitude, prop.longitude, radius_km):
+            cells |= Q(geohash__startswith=prefix)
+        min_lat, min_lng, max_lat, max_lng = geo.bounding_box(prop.latitude, prop.longitude, radius_km)
+        found += (
+            same_kind.filter(
+                cells,
+                latitude__range=(min_lat, max_lat),
+                longitude__range=(min_lng, max_lng),
+            ).exclude(pk__in=[other.pk for other in found])
+            .annotate(distance_m=geo.distance_expression(prop.latitude, prop.longitude))
+            .filter(distance_m__lte=FAR_METRES)
+            .order_by('distance_m', '-created_at')[:MAX_CANDIDATES]
+        )
+    return found
+
+
+def find_duplicates(prop):
+    """[(listing, score, components)] at or above FLAG_THRESHOLD, best first."""
+    found = []
+    for other in candidates(prop):
+        value, components = score(prop, other)
+        if value >= FLAG_THRESHOLD:
+            found.append((other, value, components))
+    found.sort(key=lambda item: -item[1])
+    return found
+
+
+def flag(prop):
+    """
+    Replaces the duplicate flags between `prop` and other listings with a
+    fresh detection. score() is symmetric, so each pair is stored both ways
+    and either listing shows the other. Returns the flags of `prop`.
+    """
+    from .models import PropertyDuplicate
+
+    rows = []
+    for other, value, components in find_duplicates(prop):
+        value = round(value, 3)
+        components = {name: round(part, 3) for name, part in components.items()}
+        rows.append(PropertyDuplicate(property=prop, duplicate_of=other, score=value, components=components))
+        rows.append(PropertyDuplicate(property=other, duplicate_of=prop, score=value, components=components))
+    with transaction.atomic():
+        PropertyDuplicate.objects.filter(Q(property=prop) | Q(duplicate_of=prop)).delete()
+        # Two listings flagged at the same moment may both write their pair
+        PropertyDuplicate.objects.bulk_create(rows, ignore_conflicts=True)
+    return rows[::2]
@@ -0,0 +1,85 @@
+"""
+Feature embeddings for "similar properties" (stored in Property.embedding).
+
+Each block of the vector is scaled so that plain L2 distance behaves like a
+sensible similarity: a different listing type or property type outweighs a
+price difference, and location counts for roughly one unit per 64 km.
+Changing the layout changes DIMENSIONS and needs a migration plus a
+`build_property_embeddings` run.
+"""
+import math
+
+PROPERTY_TYPES = ['VILLA_BUNGALOW', 'FLAT', 'PLOT', 'LAND', 'COMMERCIAL_UNIT']
+SUB_TYPES = [
+    'BUNGALOW', 'TWIN_BUNGALOW', 'ROWHOUSE', 'VILLA',
+    'RES_PLOT', 'RES_PLOT_GUNTHEWARI', 'COM_PLOT',
+    'AGRI_LAND', 'IND_LAND',
+    'SHOP', 'OFFICE', 'SHOWROOM',
+]
+LISTING_TYPES = ['SALE', 'RENT']
+AMENITY_SLOTS = 24  # Property.amenity_mask bits, with room to append
+
+# Block weights
+LISTING_TYPE_WEIGHT = 3.0
+PROPERTY_TYPE_WEIGHT = 2.0
+SUB_TYPE_WEIGHT = 1.0
+BHK_WEIGHT = 1.0
+PRICE_WEIGHT = 2.0
+AREA_WEIGHT = 1.0
+AMENITY_WEIGHT = 0.25
+LOCATION_WEIGHT = 100.0  # Unit-sphere chord length * 100 ~= 1 per 64 km
+
+DIMENSIONS = (
+    len(LISTING_TYPES) + len(PROPERTY_TYPES) + len(SUB_TYPES)
+    + 3 + AMENITY_SLOTS + 3
+)
+
+# Columns the embedding is built from (Property.save() rebuilds it when they change)
+SOURCE_FIELDS = {
+    'listing_type', 'property_type', 'sub_type', 'bhk_config', 'total_price',
+    'super_builtup_area', 'carpet_area', 'plot_area', 'latitude', 'longitude',
+    'amenity_mask',
+}
+
+
+def _one_hot(value, choices, weight):
+    return [weight if value == choice else 0.0 for choice in choices]
+
+
+def _log_scale(value, low, high):
+    """Maps value onto 0..1 on a log10 scale between 10**low and 10**high."""
+    if not value or value <= 0:
+        return 0.0
+    scaled = (math.log10(float(value)) - low) / (high - low)
+    return min(max(scaled, 0.0), 1.0)
+
+
+def build_embedding(prop):
+    """Builds the feature vector for a Property instance (amenity_mask must be current)."""
+    vector = []
+    vector += _one_hot(prop.listing_type, LISTING_TYPES, LISTING_TYPE_WEIGHT)
+    vector += _one_hot(prop.property_type, PROPERTY_TYPES, PROPERTY_TYPE_WEIGHT)
+    vector += _one_hot(prop.sub_type, SUB_TYPES, SUB_TYPE_WEIGHT)
+
+    bhk = float(prop.bhk_config or 0)
+    vector.append(min(bhk, 10.0) / 5.0 * BHK_WEIGHT)
+    # Rent: ~1e3..1e6 per month, sale: ~1e5..1e10; listing type already separates them
+    vector.append(_log_scale(prop.total_price, 3, 10) * PRICE_WEIGHT)
+    area = prop.super_builtup_area or prop.carpet_area or prop.plot_area
+    vector.append(_log_scale(area, 2, 6) * AREA_WEIGHT)
+
+    mask = prop.amenity_mask or 0
+    vector += [AMENITY_WEIGHT if mask & (1 << bit) else 0.0 for bit in range(AMENITY_SLOTS)]
+
+    if prop.latitude is not None and prop.longitude is not None:
+        lat = math.radians(prop.latitude)
+        lng = math.radians(prop.longitude)
+        vector += [
+            math.cos(lat) * math.cos(lng) * LOCATION_WEIGHT,
+            math.cos(lat) * math.sin(lng) * LOCATION_WEIGHT,
+            math.sin(lat) * LOCATION_WEIGHT,
+        ]
+    else:
+        vector += [0.0, 0.0, 0.0]
+
+    return vector
@@ -0,0 +1,76 @@
+"""
+Sidebar facet counts for property search, computed in one aggregate query.
+
+Every bucket becomes a `COUNT(*) FILTER (WHERE ...)` column of a single
+SELECT over the already-filtered queryset, so the sidebar costs one query
+whatever the number of options.
+"""
+from django.db.models import Count, Q
+
+from .models import Property
+
+BHK_BUCKETS = [
+    ('1', Q(bhk_config=1)),
+    ('2', Q(bhk_config=2)),
+    ('3', Q(bhk_config=3)),
+    ('4', Q(bhk_config=4)),
+    ('5+', Q(bhk_config__gte=5)),
+]
+
+# Matches the budget presets on the search page (key, min_price, max_price)
+PRICE_BANDS = [
+    ('50L', None, 5000000),
+    ('50L-1CR', 5000000, 10000000),
+    ('1CR-2CR', 10000000, 20000000),
+    ('2CR-5CR', 20000000, 50000000),
+    ('5CR+', 50000000, None),
+]
+
+
+def _choice_buckets(field_name):
+    choices = Property._meta.get_field(field_name).choices
+    return [(value, label, Q(**{field_name: value})) for value, label in choices]
+
+
+def _price_q(low, high):
+    q = Q()
+    if low is not None:
+        q &= Q(total_price__gte=low)
+    if high is not None:
+        q &= Q(total_price__lt=high)
+    return q
+
+
+def facet_counts(queryset):
+    """Returns the facet payload for the (already filtered) property queryset."""
+    choice_facets = {
+        name: _choice_buckets(name)
+        for name in ['property_type', 'availability_status', 'furnishing_status']
+    }
+
+    aggregates = {'total': Count('pk')}
+    for name, buckets in choice_facets.items():
+        for value, _, q in buckets:
+            aggregates[f'{name}__{value}'] = Count('pk', filter=q)
+    for key, q in BHK_BUCKETS:
+        aggregates[f'bhk_config__{key}'] = Count('pk', filter=q)
+    for key, low, high in PRICE_BANDS:
+        aggregates[f'price__{key}'] = Count('pk', filter=_price_q(low, high))
+
+    counts = queryset.order_by().aggregate(**aggregates)
+
+    result = {'total': counts['total']}
+    for name, buckets in choice_facets.items():
+        result[name] = [
+            {'value': value, 'label': label, 'count': counts[f'{name}__{value}']}
+            for value, label, _ in buckets
+        ]
+    result['bhk_config'] = [
+        {'value': key, 'count': counts[f'bhk_config__{key}']}
+        for key, _ in BHK_BUCKETS
+    ]
+    result['price'] = [
+        {'value': key, 'min_price': low, 'max_price': high, 'count': counts[f'price__{key}']}
+        for key, low, high in PRICE_BANDS
+    ]
+    return result
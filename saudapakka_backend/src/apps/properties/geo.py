@@ -0,0 +1,122 @@
+"""
+Geohash helpers for spatial search over Property.latitude/longitude.
+
+A geohash interleaves longitude and latitude bits into a base32 string, so
+points that share a prefix share a cell. Storing it in an indexed column
+turns "everything near X" into a handful of B-tree prefix range scans,
+without needing PostGIS or the earthdistance extension.
+"""
+import math
+
+from django.db.models import F, FloatField, IntegerField, Value
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_LENGTH = 12
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def encode(latitude, longitude, precision=GEOHASH_LENGTH):
+    """Encodes a coordinate into a geohash string of `precision` characters."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # Geohash bits alternate, starting with longitude
+
+    while len(chars) < precision:
+        if even:
+            rng, value = lng_range, longitude
+        else:
+            rng, value = lat_range, latitude
+
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits = bits << 1
+            rng[1] = mid
+
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Returns (height, width) in degrees of a geohash cell at `precision`."""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Returns (min_lat, min_lng, max_lat, max_lng) enclosing a circle."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+    lng_delta = radius_km / (KM_PER_DEGREE * cos_lat)
+    return (
+        max(latitude - lat_delta, -90.0),
+        max(longitude - lng_delta, -180.0),
+        min(latitude + lat_delta, 90.0),
+        min(longitude + lng_delta, 180.0),
+    )
+
+
+def covering_prefixes(latitude, longitude, radius_km):
+    """
+    Returns the geohash prefixes of the cell containing the point and its
+    eight neighbours, at the finest precision whose cells are still at least
+    `radius_km` across. Together they cover the whole search circle.
+    """
+    min_lat, min_lng, max_lat, max_lng = bounding_box(latitude, longitude, radius_km)
+    lat_delta = max_lat - latitude
+    lng_delta = max_lng - longitude
+
+    precision = 1
+    for candidate in range(GEOHASH_LENGTH, 0, -1):
+        height, width = cell_size(candidate)
+        if height >= lat_delta and width >= lng_delta:
+            precision = candidate
+            break
+
+    height, width = cell_size(precision)
+    prefixes = set()
+    for dy in (-height, 0, height):
+        for dx in (-width, 0, width):
+            lat = min(max(latitude + dy, -90.0), 90.0)
+            lng = (longitude + dx + 180.0) % 360.0 - 180.0
+            prefixes.add(encode(lat, lng, precision))
+    return sorted(prefixes)
+
+
+def precision_for_zoom(zoom):
+    """
+    Geohash length whose cells are a sensible marker-cluster size at a web
+    map zoom level (roughly a few dozen cells across the viewport).
+    """
+    thresholds = [(3, 1), (5, 2), (8, 3), (10, 4), (13, 5), (15, 6), (17, 7)]
+    for max_zoom, precision in thresholds:
+        if zoom < max_zoom:
+            return precision
+    return 8
+
+
+def distance_expression(latitude, longitude):
+    """Haversine distance in whole metres from a point to each row."""
+    lat = Value(latitude, output_field=FloatField())
+    lng = Value(longitude, output_field=FloatField())
+    a = (
+        Power(Sin(Radians(F('latitude') - lat) / 2), 2)
+        + Cos(Radians(lat)) * Cos(Radians(F('latitude')))
+        * Power(Sin(Radians(F('longitude') - lng) / 2), 2)
+    )
+    return Cast(2 * EARTH_RADIUS_KM * 1000 * ASin(Sqrt(a)), IntegerField())
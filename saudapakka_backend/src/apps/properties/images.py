@@ -0,0 +1,152 @@
+"""
+Resized WebP / JPEG variants of gallery images and floor plans.
+
+Phone uploads are 5-10 MB originals. After an upload commits,
+generate_variants() writes each image at the VARIANT_WIDTHS that are
+smaller than the original. It applies the EXIF orientation and drops
+the EXIF block, GPS coordinates included, from the copies. The stored
+names go into the instance's `variants` JSON:
+
+    {"source": "<image.name>", "width": 4032, "height": 3024,
+     "webp": {"320": "<name>", ...}, "jpeg": {"320": "<name>", ...}}
+
+The work runs in a background thread. `manage.py build_image_variants`
+backfills old rows and redoes any that a thread didn't finish.
+"""
+import io
+import logging
+import os
+import threading
+
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from .cache import bump_listing_generation
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = [320, 640, 1280]
+FORMATS = {
+    # key: (Pillow format, extension, save options)
+    'webp': ('WEBP', 'webp', {'quality': 75, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 80, 'optimize': True, 'progressive': True}),
+}
+ORIENTATION_TAG = 0x0112
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def variants_ready(instance):
+    """True if `variants` was built from the image currently stored."""
+    return bool(instance.image) and instance.variants.get('source') == instance.image.name
+
+
+def _variant_name(source_name, width, extension):
+    directory, filename = os.path.split(source_name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'variants', f'{stem}-{width}w.{extension}')
+
+
+def _open(field_file, largest_width):
+    """Decoded upright RGB image, plus the original (upright) width and height."""
+    field_file.open('rb')
+    try:
+        image = Image.open(field_file)
+        width, height = image.size
+        if image.getexif().get(ORIENTATION_TAG) in ROTATED_ORIENTATIONS:
+            width, height = height, width
+        # JPEGs can be decoded at 1/2, 1/4 or 1/8 scale, far cheaper than a full decode
+        image.draft('RGB', (largest_width, largest_width))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    finally:
+        field_file.close()
+
+    if image.mode not in ('RGB', 'L'):
+        rgba = image.convert('RGBA')
+        image = Image.new('RGB', rgba.size, 'white')
+        image.paste(rgba, mask=rgba.getchannel('A'))
+    return image.convert('RGB'), (width, height)
+
+
+def build_variants(field_file):
+    """Writes the variants of one image to its storage and returns the `variants` dict."""
+    storage = field_file.storage
+    image, (width, height) = _open(field_file, VARIANT_WIDTHS[-1])
+
+    widths = [w for w in VARIANT_WIDTHS if w < width] or [width]
+    variants = {'source': field_file.name, 'width': width, 'height': height}
+    for key in FORMATS:
+        variants[key] = {}
+
+    # Largest first, each size resampled from the previous one
+    current = image
+    for target in reversed(widths):
+        current = current.resize((target, max(1, round(image.height * target / image.width))), Image.LANCZOS)
+        for key, (pil_format, extension, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            # No exif= argument: the copies carry no metadata
+            current.save(buffer, pil_format, **options)
+            name = storage.save(_variant_name(field_file.name, target, extension), ContentFile(buffer.getvalue()))
+            variants[key][str(target)] = name
+    return variants
+
+
+def variant_names(variants):
+    """The stored file names listed in a `variants` dict."""
+    for key in FORMATS:
+        yield from (variants or {}).get(key, {}).values()
+
+
+def delete_variants(variants, storage):
+    """Removes the stored variant files listed in a `variants` dict."""
+    for name in variant_names(variants):
+        storage.delete(name)
+
+
+def generate_variants(instance):
+    """
+    Builds and saves `variants` for a PropertyImage / PropertyFloorPlan.
+    Returns True if new variants were written; False if they were already
+    current or the image is missing or can't be decoded.
+    """
+    if not instance.image or variants_ready(instance):
+        return False
+
+    try:
+        variants = build_variants(instance.image)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning("Could not build variants for %s %s: %s", type(instance).__name__, instance.pk, exc)
+        return False
+
+    old = instance.variants
+    # update() so this doesn't fire post_save and schedule itself again
+    type(instance).objects.filter(pk=instance.pk).update(variants=variants)
+    instance.variants = variants
+    if old.get('source'):
+        delete_variants(old, instance.image.storage)
+    return True
+
+
+def generate_variants_in_background(model, pks):
+    """Starts generate_variants() for the given rows in a thread once the transaction commits."""
+    pks = list(pks)
+    if not pks:
+        return
+
+    def start():
+        threading.Thread(target=_generate_variants_job, args=(model, pks), daemon=True).start()
+    transaction.on_commit(start)
+
+
+def _generate_variants_job(model, pks):
+    try:
+        built = sum(generate_variants(instance) for instance in model.objects.filter(pk__in=pks))
+        if built:
+            # Cached listing responses still point at the originals
+            bump_listing_generation()
+    except Exception:
+        # Rows stay without variants; `build_image_variants --missing` picks them up
+        logger.exception("Building image variants for %s %s failed", model.__name__, pks)
+    finally:
+        connections.close_all()
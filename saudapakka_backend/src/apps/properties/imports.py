@@ -0,0 +1,329 @@
+"""
+Bulk listing import from a CSV / XLSX sheet plus an optional zip of media.
+
+Each row is one listing. Its columns are PropertySerializer field names.
+Document columns (Property.FILE_FIELDS) and the `images` column
+(`;`-separated, first one becomes the thumbnail) hold paths inside the zip.
+
+Rows are read lazily and validated with the PropertySerializer rules.
+They are inserted with bulk_create in chunks, so a 1,000-plot layout
+imports in seconds. Media is written to storage afterwards by
+attach_media(), in a background thread, or with
+`manage.py import_properties --resume` if that thread died.
+"""
+import csv
+import io
+import logging
+import os
+import threading
+import zipfile
+from datetime import datetime
+
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import images as image_variants
+from .models import Property, PropertyImage, PropertyImport, property_search_vector
+from .serializers import PropertyImportRowSerializer
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+MEDIA_BATCH_SIZE = 50
+IMAGE_SEPARATOR = ';'
+SUPPORTED_EXTENSIONS = ['.csv', '.xlsx']
+
+
+class ImportFileError(ValueError):
+    """The sheet or archive as a whole can't be read (as opposed to a bad row)."""
+
+
+# --- Reading ---
+
+def check_source_name(name):
+    if os.path.splitext(name)[1].lower() not in SUPPORTED_EXTENSIONS:
+        raise ImportFileError(f"Unsupported file type. Upload one of: {', '.join(SUPPORTED_EXTENSIONS)}")
+
+
+def read_rows(source, name):
+    """Yields (row_number, data) for each non-empty row. The header is row 1."""
+    check_source_name(name)
+    if name.lower().endswith('.csv'):
+        rows = _csv_rows(source)
+    else:
+        rows = _xlsx_rows(source)
+
+    for number, raw in rows:
+        data = _clean_row(raw)
+        if data:
+            yield number, data
+
+
+def _csv_rows(source):
+    text = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+    try:
+        for number, row in enumerate(csv.DictReader(text), start=2):
+            yield number, row
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFileError(f"Could not read the CSV file: {exc}")
+    finally:
+        text.detach()
+
+
+def _xlsx_rows(source):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportFileError("XLSX imports need the openpyxl package. Upload a CSV instead.")
+
+    try:
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except Exception as exc:
+        raise ImportFileError(f"Could not read the XLSX file: {exc}")
+
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None) or []
+        for number, values in enumerate(rows, start=2):
+            yield number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def _clean_row(raw):
+    """Normalizes headers, drops blank cells so model defaults apply."""
+    data = {}
+    for key, value in raw.items():
+        if key is None or value is None:
+            continue
+        key = str(key).strip().lower()
+        if isinstance(value, datetime):
+            value = value.date()
+        elif isinstance(value, str):
+            value = value.strip()
+        if value == '':
+            continue
+        data[key] = value
+
+    if 'images' in data:
+        data['images'] = [p.strip() for p in str(data['images']).split(IMAGE_SEPARATOR) if p.strip()]
+    return data
+
+
+def archive_names(archive_file):
+    """File names inside a zip archive (directories excluded)."""
+    try:
+        with zipfile.ZipFile(archive_file) as archive:
+            return {info.filename for info in archive.infolist() if not info.is_dir()}
+    except zipfile.BadZipFile:
+        raise ImportFileError("The media file is not a valid zip archive.")
+    finally:
+        archive_file.seek(0)
+
+
+# --- Importing rows ---
+
+class PropertyImporter:
+    """Validates rows and inserts the valid ones as PENDING listings owned by `owner`."""
+
+    def __init__(self, owner, media_names=(), context=None, chunk_size=CHUNK_SIZE, dry_run=False):
+        self.owner = owner
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        # One serializer for every row: building PropertySerializer's fields is the slow part
+        self.serializer = PropertyImportRowSerializer(
+            context={**(context or {}), 'media_names': set(media_names)}
+        )
+        self.total_rows = 0
+        self.created_count = 0
+        self.errors = []
+        self.pending_media = []
+
+    def run(self, rows):
+        chunk = []
+        for number, data in rows:
+            self.total_rows += 1
+            item = self.build(number, data)
+            if item is None:
+                continue
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                self.insert(chunk)
+                chunk = []
+        if chunk:
+            self.insert(chunk)
+        return self
+
+    def build(self, number, data):
+        """Returns (row_number, unsaved Property, files, images), or None after recording the errors."""
+        self.serializer.initial_data = data
+        try:
+            validated = self.serializer.run_validation(data)
+        except serializers.ValidationError as exc:
+            self.errors.append({'row': number, 'errors': exc.detail})
+            return None
+
+        files = {}
+        for name in Property.FILE_FIELDS:
+            path = validated.pop(name, None)
+            if path:
+                files[name] = path
+        images = validated.pop('images', [])
+
+        prop = Property(owner=self.owner, verification_status='PENDING', **validated)
+        prop.compute_derived_fields()
+        return number, prop, files, images
+
+    def insert(self, chunk):
+        self.created_count += len(chunk)
+        if self.dry_run:
+            return
+
+        # PENDING listings never reach the public listing cache, so no cache bump here
+        properties = [prop for _, prop, _, _ in chunk]
+        with transaction.atomic():
+            Property.objects.bulk_create(properties)
+            Property.objects.filter(pk__in=[p.pk for p in properties]).update(
+                search_vector=property_search_vector()
+            )
+
+        for number, prop, files, images in chunk:
+            if files or images:
+                self.pending_media.append({
+                    'row': number, 'property': str(prop.pk), 'files': files, 'images': images,
+                })
+
+    def report(self):
+        return {
+            'total_rows': self.total_rows,
+            'created_count': self.created_count,
+            'errors': self.errors,
+        }
+
+
+def run_import(owner, source, source_name, media=None, context=None, chunk_size=CHUNK_SIZE):
+    """
+    Imports every valid row and returns the PropertyImport. Media attachment
+    is left to attach_media(); the job stays PROCESSING_MEDIA until then.
+    Raises ImportFileError if the sheet or archive can't be read at all. A
+    sheet that breaks partway keeps the chunks already committed: the error
+    is added to the report and their media is still attached.
+    """
+    check_source_name(source_name)
+    media_names = archive_names(media) if media else set()
+
+    job = PropertyImport.objects.create(
+        owner=owner, source_name=source_name, status='IMPORTING', media=media,
+    )
+    importer = PropertyImporter(owner, media_names, context=context, chunk_size=chunk_size)
+    try:
+        importer.run(read_rows(source, source_name))
+    except ImportFileError as exc:
+        importer.errors.append({'row': None, 'errors': {'file': str(exc)}})
+        if not importer.created_count:
+            _finish(job, importer, status='FAILED')
+            raise
+
+    _finish(job, importer, status='PROCESSING_MEDIA' if importer.pending_media else 'COMPLETED')
+    return job
+
+
+def _finish(job, importer, status):
+    job.total_rows = importer.total_rows
+    job.created_count = importer.created_count
+    job.errors = importer.errors
+    job.pending_media = importer.pending_media
+    job.status = status
+    if status != 'PROCESSING_MEDIA':
+        job.completed_at = timezone.now()
+        if job.media:
+            job.media.delete(save=False)
+    job.save()
+
+
+# --- Attaching media ---
+
+def attach_media(job):
+    """
+    Copies the files each imported listing references out of the zip into
+    storage. Progress is saved per batch, so an interrupted run can resume.
+    """
+    with job.media.open('rb') as media, zipfile.ZipFile(media) as archive:
+        while job.pending_media:
+            batch = job.pending_media[:MEDIA_BATCH_SIZE]
+            errors = _attach_batch(archive, batch)
+            job.pending_media = job.pending_media[MEDIA_BATCH_SIZE:]
+            job.errors = job.errors + errors
+            job.save(update_fields=['pending_media', 'errors'])
+
+    job.status = 'COMPLETED'
+    job.completed_at = timezone.now()
+    job.media.delete(save=False)
+    job.save()
+
+
+def _attach_batch(archive, batch):
+    properties = {
+        str(prop.pk): prop
+        for prop in Property.objects.only('id', *Property.FILE_FIELDS).filter(
+            pk__in=[item['property'] for item in batch]
+        )
+    }
+    errors = []
+    updated = []
+    images = []
+
+    for item in batch:
+        prop = properties.get(item['property'])
+        if prop is None:
+            continue  # Deleted since the import
+
+        failed = {}
+        for field_name, path in item['files'].items():
+            try:
+                getattr(prop, field_name).save(os.path.basename(path), ContentFile(archive.read(path)), save=False)
+            except (KeyError, OSError, zipfile.BadZipFile) as exc:
+                failed[field_name] = f"Could not attach '{path}': {exc}"
+        for index, path in enumerate(item['images']):
+            image = PropertyImage(property=prop, is_thumbnail=index == 0, order=index)
+            try:
+                image.image.save(os.path.basename(path), ContentFile(archive.read(path)), save=False)
+            except (KeyError, OSError, zipfile.BadZipFile) as exc:
+                failed.setdefault('images', []).append(f"Could not attach '{path}': {exc}")
+                continue
+            images.append(image)
+
+        if item['files']:
+            updated.append(prop)
+        if failed:
+            errors.append({'row': item['row'], 'errors': failed})
+
+    with transaction.atomic():
+        if updated:
+            # The documents were counted as they were saved to storage above
+            Property.objects.bulk_update(updated, Property.FILE_FIELDS)
+        PropertyImage.objects.bulk_create(images)
+
+    # bulk_create skips post_save, and this already runs off the request path
+    for image in images:
+        image_variants.generate_variants(image)
+    return errors
+
+
+def attach_media_in_background(job):
+    """Starts attach_media() in a thread once the surrounding transaction commits."""
+    def start():
+        threading.Thread(target=_attach_media_job, args=(job.pk,), daemon=True).start()
+    transaction.on_commit(start)
+
+
+def _attach_media_job(job_id):
+    try:
+        attach_media(PropertyImport.objects.get(pk=job_id))
+    except Exception:
+        # The job stays PROCESSING_MEDIA; `import_properties --resume` picks it up
+        logger.exception("Attaching media for property import %s failed", job_id)
+    finally:
+        connections.close_all()
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from apps.properties.models import PropertyImage, PropertyFloorPlan
+from apps.properties import images
+from apps.properties.cache import bump_listing_generation
+
+
+class Command(BaseCommand):
+    help = 'Builds the resized WebP/JPEG copies of gallery images and floor plans in primary-key batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--missing', action='store_true', help='Only rows without variants')
+
+    def handle(self, *args, **options):
+        built = 0
+        for model in (PropertyImage, PropertyFloorPlan):
+            queryset = model.objects.exclude(image='').order_by('pk').only('pk', 'image', 'variants')
+            if options['missing']:
+                queryset = queryset.filter(variants={})
+            built += self.build(model, queryset, options['batch_size'])
+
+        if built:
+            bump_listing_generation()
+        self.stdout.write(self.style.SUCCESS(f'Variants built for {built} images.'))
+
+    def build(self, model, queryset, batch_size):
+        built = 0
+        last_pk = None
+        while True:
+            batch_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(batch_qs[:batch_size])
+            if not batch:
+                break
+
+            built += sum(images.generate_variants(instance) for instance in batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f'{model.__name__}: {built} built...')
+        return built
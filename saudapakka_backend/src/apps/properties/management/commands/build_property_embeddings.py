@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from apps.properties.models import Property
+from apps.properties import embeddings
+
+
+class Command(BaseCommand):
+    help = 'Builds the "similar properties" embedding for every property in primary-key batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--missing', action='store_true', help='Only rows without an embedding')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Property.objects.order_by('pk').only(
+            'pk', *(embeddings.SOURCE_FIELDS)
+        )
+        if options['missing']:
+            queryset = queryset.filter(embedding__isnull=True)
+
+        built = 0
+        last_pk = None
+        while True:
+            batch_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(batch_qs[:batch_size])
+            if not batch:
+                break
+
+            for prop in batch:
+                prop.embedding = embeddings.build_embedding(prop)
+            Property.objects.bulk_update(batch, ['embedding'])
+
+            built += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f'Embedded {built} properties...')
+
+        self.stdout.write(self.style.SUCCESS(f'Embeddings built for {built} properties.'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from apps.properties.models import Property
+from apps.properties import duplicates
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the duplicate-detection signatures in primary-key batches and re-flags probable duplicates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pending', action='store_true', help='Only flag listings awaiting verification')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Property.objects.order_by('pk')
+
+        # Signatures first, so every listing can be found as a candidate
+        built = 0
+        last_pk = None
+        while True:
+            batch_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(batch_qs.only('pk', *duplicates.SOURCE_FIELDS)[:batch_size])
+            if not batch:
+                break
+            for prop in batch:
+                prop.dedupe_signature, prop.dedupe_bands = duplicates.build_signature(prop)
+            Property.objects.bulk_update(batch, ['dedupe_signature', 'dedupe_bands'])
+            built += len(batch)
+            last_pk = batch[-1].pk
+        self.stdout.write(f'Signatures built for {built} properties.')
+
+        if options['pending']:
+            queryset = queryset.filter(verification_status='PENDING')
+        flagged = 0
+        for prop in queryset.iterator(chunk_size=batch_size):
+            flagged += bool(duplicates.flag(prop))
+        self.stdout.write(self.style.SUCCESS(f'{flagged} properties flagged as probable duplicates.'))
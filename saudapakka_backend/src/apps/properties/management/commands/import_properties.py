@@ -0,0 +1,71 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.properties import imports
+from apps.properties.models import PropertyImport
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-imports listings from a CSV/XLSX sheet (plus an optional zip of media) for an owner, '
+        'or with --resume attaches media for imports whose background step did not finish.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='.csv or .xlsx file, one listing per row')
+        parser.add_argument('--owner', help='Email of the user the listings belong to')
+        parser.add_argument('--media', help='.zip with the images/documents the rows reference')
+        parser.add_argument('--chunk-size', type=int, default=imports.CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, create nothing')
+        parser.add_argument('--resume', action='store_true', help='Attach media for unfinished imports')
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            return self.resume()
+        if not options['path'] or not options['owner']:
+            raise CommandError('path and --owner are required.')
+
+        User = get_user_model()
+        try:
+            owner = User.objects.get(email=options['owner'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['owner']}")
+
+        media = File(open(options['media'], 'rb'), name=os.path.basename(options['media'])) if options['media'] else None
+        try:
+            with open(options['path'], 'rb') as source:
+                name = os.path.basename(options['path'])
+                if options['dry_run']:
+                    media_names = imports.archive_names(media) if media else set()
+                    report = imports.PropertyImporter(owner, media_names, dry_run=True).run(
+                        imports.read_rows(source, name)
+                    ).report()
+                else:
+                    job = imports.run_import(owner, source, name, media=media, chunk_size=options['chunk_size'])
+                    if job.status == 'PROCESSING_MEDIA':
+                        self.stdout.write('Attaching media...')
+                        imports.attach_media(job)
+                    report = {'total_rows': job.total_rows, 'created_count': job.created_count, 'errors': job.errors}
+        except imports.ImportFileError as e:
+            raise CommandError(str(e))
+        finally:
+            if media:
+                media.close()
+
+        for error in report['errors']:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {json.dumps(error['errors'])}"))
+        verb = 'would be created' if options['dry_run'] else 'created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created_count']} of {report['total_rows']} listings {verb}, {len(report['errors'])} rows with errors."
+        ))
+
+    def resume(self):
+        jobs = PropertyImport.objects.filter(status='PROCESSING_MEDIA')
+        for job in jobs:
+            self.stdout.write(f'Attaching media for import {job.pk} ({job.source_name})...')
+            imports.attach_media(job)
+        self.stdout.write(self.style.SUCCESS(f'Resumed {len(jobs)} imports.'))
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.properties.models import ChunkedUpload
+from apps.properties import uploads
+
+
+class Command(BaseCommand):
+    help = 'Deletes chunked uploads that were never attached to a property, with their files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Age after which an unattached upload is abandoned')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = ChunkedUpload.objects.exclude(status='ATTACHED').filter(created_at__lt=cutoff)
+
+        purged = 0
+        for upload in stale.iterator():
+            uploads.discard(upload)
+            purged += 1
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} abandoned uploads.'))
@@ -0,0 +1,61 @@
+import os
+
+from django.core.management.base import BaseCommand
+from apps.properties.models import (
+    Property, PropertyImage, PropertyFloorPlan, PropertyImport, ChunkedUpload, MediaBlob, PendingFileDeletion,
+)
+from apps.properties import deletions, images
+
+
+class Command(BaseCommand):
+    help = (
+        'Retries queued file deletions, reports the ones that keep failing and, '
+        'with --orphans, lists stored files no database row refers to.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true', help=f'Also retry jobs that failed {deletions.MAX_ATTEMPTS} times')
+        parser.add_argument('--orphans', action='store_true', help='List orphaned files under properties/')
+
+    def handle(self, *args, **options):
+        failed_jobs = PendingFileDeletion.objects.filter(attempts__gte=deletions.MAX_ATTEMPTS)
+        if options['retry_failed']:
+            failed_jobs.update(attempts=0)
+
+        deleted, failed = deletions.process()
+        self.stdout.write(f'{deleted} files deleted, {failed} deletions failed.')
+
+        for job in failed_jobs:
+            self.stderr.write(f'Gave up on {job.name} after {job.attempts} attempts: {job.last_error}')
+        pending = PendingFileDeletion.objects.filter(attempts__lt=deletions.MAX_ATTEMPTS).count()
+        self.stdout.write(self.style.SUCCESS(f'{pending} deletions still queued.'))
+
+        if options['orphans']:
+            self.report_orphans()
+
+    def report_orphans(self):
+        referenced = set(MediaBlob.objects.values_list('name', flat=True))
+        referenced.update(PendingFileDeletion.objects.values_list('name', flat=True))
+        for field in Property.FILE_FIELDS:
+            referenced.update(Property.objects.exclude(**{field: ''}).values_list(field, flat=True).iterator(chunk_size=5000))
+        for model in (PropertyImage, PropertyFloorPlan):
+            for name, variants in model.objects.values_list('image', 'variants').iterator(chunk_size=5000):
+                referenced.add(name)
+                referenced.update(images.variant_names(variants))
+        referenced.update(PropertyImport.objects.exclude(media='').values_list('media', flat=True))
+        referenced.update(ChunkedUpload.objects.exclude(file='').values_list('file', flat=True))
+
+        storage = deletions.STORAGES['default']
+        orphans = [name for name in self._walk(storage, 'properties') if name not in referenced]
+        for name in orphans:
+            self.stdout.write(name)
+        self.stdout.write(self.style.WARNING(f'{len(orphans)} orphaned files.'))
+
+    def _walk(self, storage, directory):
+        if not storage.exists(directory):
+            return
+        subdirectories, files = storage.listdir(directory)
+        for name in files:
+            yield os.path.join(directory, name)
+        for subdirectory in subdirectories:
+            yield from self._walk(storage, os.path.join(directory, subdirectory))
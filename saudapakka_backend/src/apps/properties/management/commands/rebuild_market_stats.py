@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.properties import market
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the locality price rollup (LocalityPriceStats) from the verified listings.'
+
+    def handle(self, *args, **options):
+        rows = market.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} locality price rows.'))
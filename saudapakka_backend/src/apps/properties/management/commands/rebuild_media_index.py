@@ -0,0 +1,55 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from apps.properties.models import Property, ChunkedUpload, MediaBlob
+from apps.properties import media
+
+
+class Command(BaseCommand):
+    help = (
+        'Registers stored documents in the MediaBlob hash index and recounts '
+        'their references from the file fields that point at them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--purge', action='store_true', help='Delete blobs nothing references')
+
+    def handle(self, *args, **options):
+        storage = media.document_storage
+        references = Counter()
+        for field in Property.DOCUMENT_FIELDS:
+            names = Property.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            references.update(names.values_list(field, flat=True).iterator(chunk_size=5000))
+        uploads = ChunkedUpload.objects.exclude(status='ATTACHED').exclude(file='')
+        references.update(uploads.values_list('file', flat=True).iterator())
+
+        # Files stored before the index existed
+        known = set(MediaBlob.objects.filter(name__in=list(references)).values_list('name', flat=True))
+        registered = 0
+        for name in references.keys() - known:
+            if not storage.exists(name):
+                self.stderr.write(f'Missing file: {name}')
+                continue
+            with storage.open(name, 'rb') as content:
+                digest = media.file_sha256(content)
+            MediaBlob.objects.create(name=name, sha256=digest, size=storage.size(name))
+            registered += 1
+
+        recounted = []
+        for blob in MediaBlob.objects.iterator():
+            count = references.get(blob.name, 0)
+            if blob.ref_count != count:
+                blob.ref_count = count
+                recounted.append(blob)
+        MediaBlob.objects.bulk_update(recounted, ['ref_count'], batch_size=1000)
+
+        purged = 0
+        if options['purge']:
+            for blob in MediaBlob.objects.filter(ref_count=0).iterator():
+                storage.delete(blob.name)
+                blob.delete()
+                purged += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{registered} files registered, {len(recounted)} counts corrected, {purged} blobs purged.'
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from apps.properties.models import Property, property_search_vector
+
+
+class Command(BaseCommand):
+    help = 'Backfills Property.search_vector in primary-key batches (use --missing to skip rows already indexed).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--missing', action='store_true', help='Only rows with an empty search_vector')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Property.objects.order_by('pk')
+        if options['missing']:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        updated = 0
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            pks = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+
+            updated += Property.objects.filter(pk__in=pks).update(search_vector=property_search_vector())
+            last_pk = pks[-1]
+            self.stdout.write(f'Indexed {updated} properties...')
+
+        self.stdout.write(self.style.SUCCESS(f'Search vectors rebuilt for {updated} properties.'))
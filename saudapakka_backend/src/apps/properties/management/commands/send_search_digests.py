@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.properties import saved_searches
+
+
+class Command(BaseCommand):
+    help = 'Sends the daily digest notification of every DAILY saved search with new matching listings. Run once a day.'
+
+    def handle(self, *args, **options):
+        sent = saved_searches.send_digests()
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} saved search digests.'))
@@ -0,0 +1,214 @@
+"""
+Locality price rollups for market insights.
+
+LocalityPriceStats keeps one row per (city, locality, property_type,
+listing_type, month) of VERIFIED listings, where the month is the one the
+listing was created in. Each row holds:
+- the count and the price sum;
+- a price histogram and a price-per-sqft histogram over log-spaced buckets
+  (each bucket is GAMMA times wider than the previous one).
+Medians and quantiles are read off the histograms to within about
+GAMMA / 2 relative error. Histograms of several rows add up, so a city's
+last 12 months is the element-wise sum of its rows.
+
+Property save/delete receivers apply each listing's change as -1 on its old
+contribution and +1 on its new one, in a single upsert that adds the
+deltas to the stored histograms. Bulk moderation applies a whole batch the
+same way. `manage.py rebuild_market_stats` recomputes the whole table from
+the listings.
+"""
+import math
+from collections import namedtuple
+from datetime import date
+
+from django.db import connection
+from django.utils import timezone
+
+GAMMA = 1.1
+PRICE_MIN, PRICE_MAX = 10_000, 10_000_000_000
+PPSF_MIN, PPSF_MAX = 100, 1_000_000
+
+
+def _bucket_count(low, high):
+    return math.ceil(math.log(high / low, GAMMA)) + 1
+
+
+PRICE_BUCKETS = _bucket_count(PRICE_MIN, PRICE_MAX)
+PPSF_BUCKETS = _bucket_count(PPSF_MIN, PPSF_MAX)
+
+# Columns whose change can move a listing between rows or buckets
+SOURCE_FIELDS = {
+    'verification_status', 'city', 'locality', 'property_type', 'listing_type', 'total_price',
+    'price_per_sqft', 'super_builtup_area', 'carpet_area', 'plot_area',
+}
+
+Contribution = namedtuple('Contribution', 'city locality property_type listing_type month price ppsf')
+
+
+def bucket(value, low, buckets):
+    """Histogram index of `value`; out-of-range values land in the end buckets."""
+    if value <= low:
+        return 0
+    return min(int(math.log(value / low, GAMMA)), buckets - 1)
+
+
+def bucket_value(index, low):
+    """Geometric midpoint of a bucket."""
+    return low * GAMMA ** (index + 0.5)
+
+
+def quantile(histogram, q, low):
+    """Approximate q-quantile (0..1) of the values in a histogram, or None if empty."""
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen > rank:
+            return round(bucket_value(index, low), 2)
+    return round(bucket_value(len(histogram) - 1, low), 2)
+
+
+def month_start(months_back=0):
+    """First day of the month `months_back` months before the current one."""
+    today = timezone.now().date()
+    index = today.year * 12 + today.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def price_per_sqft(prop):
+    """The listed price per sqft, else the price over the first known area."""
+    if prop.price_per_sqft:
+        return float(prop.price_per_sqft)
+    area = prop.super_builtup_area or prop.carpet_area or prop.plot_area
+    if area and prop.total_price:
+        return float(prop.total_price) / float(area)
+    return None
+
+
+def contribution(prop):
+    """What a listing adds to the rollup, or None if it isn't counted."""
+    if prop.verification_status != 'VERIFIED' or not prop.total_price or not prop.created_at:
+        return None
+    return Contribution(
+        city=(prop.city or '').strip(),
+        locality=(prop.locality or '').strip(),
+        property_type=prop.property_type,
+        listing_type=prop.listing_type,
+        month=prop.created_at.date().replace(day=1),
+        price=float(prop.total_price),
+        ppsf=price_per_sqft(prop),
+    )
+
+
+def apply(old, new):
+    """Moves one listing from contribution `old` to `new` (either may be None)."""
+    apply_many([(old, new)])
+
+
+def apply_many(changes):
+    """
+    Applies [(old, new)] contribution changes in one upsert. Changes to the
+    same row are summed first, and each row's histograms are added to
+    element-wise.
+    """
+    from .models import LocalityPriceStats
+
+    deltas = {}
+    for old, new in changes:
+        if old == new:
+            continue
+        for item, sign in ((old, -1), (new, 1)):
+            if item is None:
+                continue
+            delta = deltas.setdefault(item[:5], [0, 0.0, [0] * PRICE_BUCKETS, [0] * PPSF_BUCKETS])
+            delta[0] += sign
+            delta[1] += sign * item.price
+            delta[2][bucket(item.price, PRICE_MIN, PRICE_BUCKETS)] += sign
+            if item.ppsf is not None:
+                delta[3][bucket(item.ppsf, PPSF_MIN, PPSF_BUCKETS)] += sign
+    # A listing that moved within its own row and buckets can cancel out
+    # entirely; a price edit inside one bucket still changes price_sum
+    deltas = {
+        key: delta for key, delta in deltas.items()
+        if delta[0] or delta[1] or any(delta[2]) or any(delta[3])
+    }
+    if not deltas:
+        return
+
+    table = LocalityPriceStats._meta.db_table
+
+    def add_arrays(column):
+        return (
+            f'{column} = ARRAY(SELECT COALESCE(a, 0) + COALESCE(b, 0) '
+            f'FROM unnest({table}.{column}, EXCLUDED.{column}) WITH ORDINALITY AS u(a, b, i) ORDER BY i)'
+        )
+
+    rows = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s::integer[], %s::integer[])'] * len(deltas))
+    params = [value for key, delta in deltas.items() for value in (*key, *delta)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (city, locality, property_type, listing_type, month, '
+            f'count, price_sum, price_histogram, ppsf_histogram) VALUES {rows} '
+            f'ON CONFLICT (city, locality, property_type, listing_type, month) DO UPDATE SET '
+            f'count = {table}.count + EXCLUDED.count, price_sum = {table}.price_sum + EXCLUDED.price_sum, '
+            f'{add_arrays("price_histogram")}, {add_arrays("ppsf_histogram")}',
+            params,
+        )
+
+
+def rebuild(Property=None, LocalityPriceStats=None):
+    """
+    Recomputes every rollup row from the VERIFIED listings. Returns the number
+    of rows. Migrations pass their historical models.
+    """
+    from django.db import transaction
+    from . import models
+
+    Property = Property or models.Property
+    LocalityPriceStats = LocalityPriceStats or models.LocalityPriceStats
+
+    rows = {}
+    listings = Property.objects.filter(verification_status='VERIFIED').only(
+        'created_at', *SOURCE_FIELDS,
+    )
+    for prop in listings.iterator(chunk_size=2000):
+        item = contribution(prop)
+        if item is None:
+            continue
+        key = item[:5]
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = LocalityPriceStats(
+                **dict(zip(Contribution._fields[:5], key)),
+                count=0, price_sum=0, price_histogram=[0] * PRICE_BUCKETS, ppsf_histogram=[0] * PPSF_BUCKETS,
+            )
+        row.count += 1
+        row.price_sum += item.price
+        row.price_histogram[bucket(item.price, PRICE_MIN, PRICE_BUCKETS)] += 1
+        if item.ppsf is not None:
+            row.ppsf_histogram[bucket(item.ppsf, PPSF_MIN, PPSF_BUCKETS)] += 1
+
+    with transaction.atomic():
+        LocalityPriceStats.objects.all().delete()
+        LocalityPriceStats.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
+
+
+def summarize(rows):
+    """Merges rollup rows into {listings, avg_price, median_price, price_per_sqft: {p25, median, p75}}."""
+    count = sum(row.count for row in rows)
+    price_histogram = [sum(cells) for cells in zip(*(row.price_histogram for row in rows))] or [0]
+    ppsf_histogram = [sum(cells) for cells in zip(*(row.ppsf_histogram for row in rows))] or [0]
+    return {
+        'listings': count,
+        'avg_price': round(float(sum(row.price_sum for row in rows)) / count, 2) if count else None,
+        'median_price': quantile(price_histogram, 0.5, PRICE_MIN),
+        'price_per_sqft': {
+            'p25': quantile(ppsf_histogram, 0.25, PPSF_MIN),
+            'median': quantile(ppsf_histogram, 0.5, PPSF_MIN),
+            'p75': quantile(ppsf_histogram, 0.75, PPSF_MIN),
+        },
+    }
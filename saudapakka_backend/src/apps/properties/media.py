@@ -0,0 +1,150 @@
+"""
+Content-addressed storage for listing documents.
+
+Sellers attach the same 7/12 extract or layout sanction to every plot in
+a layout. document_storage names each file by the SHA-256 of its bytes,
+so identical uploads share one stored blob. A MediaBlob row per blob
+counts the file fields that point at it:
+- ContentAddressedStorage.save() counts the field the file is saved for.
+- retain() runs when a field starts using a name that is already stored.
+- release() runs when a field stops using it.
+A blob is deleted only when its count drops to zero.
+
+MediaBlob also works as a hash index: the same sha256 on listings of
+different owners is the same document, re-used (see duplicate_documents).
+Files stored before this existed have no MediaBlob row. They are
+deleted as before, until `manage.py rebuild_media_index` registers them.
+Deletion itself goes through the queue in deletions.py.
+"""
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils.deconstruct import deconstructible
+
+HASH_BLOCK_SIZE = 64 * 1024
+
+
+def file_sha256(content):
+    """Hex SHA-256 of a File, read in chunks. Leaves the file at position 0."""
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks(HASH_BLOCK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Saves every file as <directory>/<aa>/<bb>/<sha256><ext>. Saving
+    content that is already stored writes nothing and returns the
+    existing name. Either way the blob gains one reference, for the field
+    the file is being saved to.
+    """
+
+    def __init__(self, directory='properties/docs', **kwargs):
+        self.directory = directory
+        super().__init__(**kwargs)
+
+    def blob_name(self, digest, name):
+        extension = os.path.splitext(name)[1].lower()
+        return f'{self.directory}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+    def save(self, name, content, max_length=None):
+        from .models import MediaBlob
+
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = file_sha256(content)
+        name = self.blob_name(digest, name)
+        with transaction.atomic():
+            # The reference is taken under the blob's row lock, so a queued
+            # deletion either ran first (and the file is written again here)
+            # or runs after and finds ref_count > 0
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if not self.exists(name):
+                name = self._save(name, content)
+            if blob is None:
+                blob, _ = MediaBlob.objects.get_or_create(
+                    name=name, defaults={'sha256': digest, 'size': self.size(name)},
+                )
+            MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+        return name
+
+
+document_storage = ContentAddressedStorage()
+
+
+def retain(names):
+    """One more file field now points at each of the stored `names` (set without saving a file)."""
+    from .models import MediaBlob
+    for name in filter(None, names):
+        MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+
+def release(names):
+    """
+    One file field fewer points at each of `names`. Blobs left unreferenced
+    are queued for deletion, and spared if re-used before the job runs.
+    """
+    from .models import MediaBlob
+    from .deletions import enqueue
+
+    unreferenced = []
+    for name in filter(None, names):
+        blobs = MediaBlob.objects.filter(name=name)
+        # No row: stored before the index existed, so nothing else shares it
+        if not blobs.update(ref_count=Greatest(F('ref_count') - 1, 0)) or blobs.filter(ref_count=0).exists():
+            unreferenced.append(name)
+    enqueue(unreferenced, storage='documents')
+
+
+def field_names(instance, fields):
+    """{field: stored name} for the non-empty file fields of an instance."""
+    return {field: getattr(instance, field).name for field in fields if getattr(instance, field)}
+
+
+def duplicate_documents(sha256=None, limit=100):
+    """
+    Documents attached to listings of more than one owner, most shared first.
+    [{"sha256", "name", "size", "ref_count", "owners", "listings": [{"id", "title", "owner", "field"}]}]
+    With `sha256`, that one document wherever it is attached, regardless of owners.
+    """
+    from .models import MediaBlob, Property
+
+    blobs = MediaBlob.objects.order_by('-ref_count', 'name')
+    blobs = blobs.filter(sha256=sha256) if sha256 else blobs.filter(ref_count__gt=1)
+    blobs = {blob.name: blob for blob in blobs[:limit * 10]}
+    if not blobs:
+        return []
+
+    fields = Property.DOCUMENT_FIELDS
+    match = Q()
+    for field in fields:
+        match |= Q(**{f'{field}__in': list(blobs)})
+    listings = {}
+    for row in Property.objects.filter(match).values('id', 'title', 'owner__email', *fields):
+        for field in fields:
+            if row[field] in blobs:
+                listings.setdefault(row[field], []).append({
+                    'id': str(row['id']), 'title': row['title'], 'owner': row['owner__email'], 'field': field,
+                })
+
+    results = []
+    for name, attached in listings.items():
+        owners = sorted({item['owner'] for item in attached})
+        if len(owners) < 2 and not sha256:
+            continue
+        blob = blobs[name]
+        results.append({
+            'sha256': blob.sha256, 'name': name, 'size': blob.size, 'ref_count': blob.ref_count,
+            'owners': owners, 'listings': attached,
+        })
+    results.sort(key=lambda item: (-len(item['owners']), -item['ref_count']))
+    return results[:limit]
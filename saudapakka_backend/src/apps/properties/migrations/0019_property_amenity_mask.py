@@ -0,0 +1,37 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:59
+
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+# Frozen copy of models.AMENITY_FIELDS at the time of this migration (bit order matters)
+AMENITY_COLUMNS = [
+    'has_power_backup', 'has_lift', 'has_swimming_pool', 'has_club_house',
+    'has_gym', 'has_park', 'has_reserved_parking', 'has_security',
+    'is_vastu_compliant', 'has_intercom', 'has_piped_gas', 'has_wifi',
+    'has_drainage_line', 'has_one_gate_entry', 'has_jogging_park', 'has_children_park',
+    'has_temple', 'has_water_line', 'has_street_light', 'has_internal_roads',
+]
+
+
+def backfill_amenity_mask(apps, schema_editor):
+    Property = apps.get_model('properties', 'Property')
+    mask = Value(0)
+    for bit, column in enumerate(AMENITY_COLUMNS):
+        mask = mask + Case(When(**{column: True}, then=Value(1 << bit)), default=Value(0))
+    Property.objects.update(amenity_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0018_property_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='amenity_mask',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_amenity_mask, migrations.RunPython.noop),
+    ]
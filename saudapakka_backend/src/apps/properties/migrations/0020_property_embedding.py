@@ -0,0 +1,26 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:03
+
+import pgvector.django
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0019_property_amenity_mask'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        pgvector.django.VectorExtension(),
+        migrations.AddField(
+            model_name='property',
+            name='embedding',
+            field=pgvector.django.VectorField(blank=True, dimensions=49, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=pgvector.django.HnswIndex(condition=models.Q(('verification_status', 'VERIFIED')), ef_construction=64, fields=['embedding'], m=16, name='property_embedding_hnsw', opclasses=['vector_l2_ops']),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0023_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='propertyimage',
+            options={'ordering': ['order', 'id']},
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='order',
+            field=models.IntegerField(default=0, help_text='Display order'),
+        ),
+    ]
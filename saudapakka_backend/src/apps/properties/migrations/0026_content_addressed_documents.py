@@ -0,0 +1,85 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:36
+
+import apps.properties.media
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0025_chunked_upload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='chunkedupload',
+            name='file',
+            field=models.FileField(blank=True, max_length=255, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='building_commencement_certificate',
+            field=models.FileField(max_length=255, null=True, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='building_completion_certificate',
+            field=models.FileField(max_length=255, null=True, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='doc_7_12_or_pr_card',
+            field=models.FileField(max_length=255, null=True, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='gst_registration',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='layout_order',
+            field=models.FileField(max_length=255, null=True, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='layout_sanction',
+            field=models.FileField(max_length=255, null=True, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='mojani_nakasha',
+            field=models.FileField(max_length=255, null=True, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='na_order_or_gunthewari',
+            field=models.FileField(max_length=255, null=True, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='rera_project_certificate',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='sale_deed_registration_copy',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='title_search_report',
+            field=models.FileField(max_length=255, null=True, storage=apps.properties.media.ContentAddressedStorage(), upload_to='properties/docs/'),
+        ),
+    ]
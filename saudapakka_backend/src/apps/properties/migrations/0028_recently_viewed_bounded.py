@@ -0,0 +1,49 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:40
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0027_pending_file_deletion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Keep one row per user/property, then each user's 20 most recent
+        migrations.RunSQL(
+            """
+            DELETE FROM properties_recentlyviewed rv
+            USING (
+                SELECT id,
+                       row_number() OVER (PARTITION BY user_id, property_id ORDER BY viewed_at DESC, id DESC) AS pair_rank
+                FROM properties_recentlyviewed
+            ) ranked
+            WHERE rv.id = ranked.id AND ranked.pair_rank > 1;
+
+            DELETE FROM properties_recentlyviewed rv
+            USING (
+                SELECT id, row_number() OVER (PARTITION BY user_id ORDER BY viewed_at DESC, id DESC) AS user_rank
+                FROM properties_recentlyviewed
+            ) ranked
+            WHERE rv.id = ranked.id AND ranked.user_rank > 20;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='recentlyviewed',
+            name='viewed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='recentlyviewed',
+            index=models.Index(models.F('user'), models.OrderBy(models.F('viewed_at'), descending=True), name='recentlyviewed_user_recent_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='recentlyviewed',
+            constraint=models.UniqueConstraint(fields=('user', 'property'), name='recentlyviewed_user_property_uniq'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0028_recently_viewed_bounded'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('saves', models.PositiveIntegerField(default=0)),
+                ('contact_reveals', models.PositiveIntegerField(default=0)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='properties.property')),
+            ],
+            options={
+                'verbose_name_plural': 'Property stats',
+                'indexes': [models.Index(fields=['date'], name='propertystats_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='propertystats',
+            constraint=models.UniqueConstraint(fields=('property', 'date'), name='propertystats_property_date_uniq'),
+        ),
+    ]
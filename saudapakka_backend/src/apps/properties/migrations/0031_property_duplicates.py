@@ -0,0 +1,58 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:51
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0030_saved_searches'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyDuplicate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('components', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-score'],
+            },
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='dedupe_bands',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='dedupe_signature',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['dedupe_bands'], name='property_dedupe_bands_gin'),
+        ),
+        migrations.AddField(
+            model_name='propertyduplicate',
+            name='duplicate_of',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='properties.property'),
+        ),
+        migrations.AddField(
+            model_name='propertyduplicate',
+            name='property',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicate_flags', to='properties.property'),
+        ),
+        migrations.AddConstraint(
+            model_name='propertyduplicate',
+            constraint=models.UniqueConstraint(fields=('property', 'duplicate_of'), name='propertyduplicate_pair_uniq'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.2 on 2026-10-17 04:53
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+def build_rollup(apps, schema_editor):
+    # The save receivers only apply deltas, so start from the current listings
+    from apps.properties import market
+    market.rebuild(apps.get_model('properties', 'Property'), apps.get_model('properties', 'LocalityPriceStats'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0031_property_duplicates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocalityPriceStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=100)),
+                ('locality', models.CharField(max_length=255)),
+                ('property_type', models.CharField(max_length=50)),
+                ('listing_type', models.CharField(max_length=10)),
+                ('month', models.DateField(help_text='First day of the month the listings were created in')),
+                ('count', models.IntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('price_histogram', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None)),
+                ('ppsf_histogram', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None)),
+            ],
+            options={
+                'verbose_name_plural': 'Locality price stats',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='localitypricestats',
+            constraint=models.UniqueConstraint(fields=('city', 'locality', 'property_type', 'listing_type', 'month'), name='localitypricestats_key_uniq'),
+        ),
+        migrations.RunPython(build_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-17 05:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0032_locality_price_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_verified_search_idx',
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('verification_status', 'VERIFIED')), fields=['property_type', 'total_price'], name='property_verified_type_idx'),
+        ),
+    ]
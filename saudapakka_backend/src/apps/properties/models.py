@@ -1,10 +1,163 @@
 import uuid
 from django.db import models
-from pgvector.django import VectorField
+from django.db.models.functions import Coalesce
+from pgvector.django import VectorField, HnswIndex
 from django.conf import settings
-from django.db.models.signals import post_delete
+from django.utils import timezone
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db.models.signals import pre_save, post_delete, post_save
 from django.dispatch import receiver
 
+from . import geo, duplicates, embeddings, images, market, media, deletions
+from .cache import bump_listing_generation_on_commit
+
+# Text search configuration and per-column weights (A ranks highest)
+SEARCH_CONFIG = 'english'
+SEARCH_WEIGHTS = {
+    'title': 'A',
+    'project_name': 'A',
+    'locality': 'B',
+    'city': 'B',
+    'address_line': 'C',
+    'landmarks': 'D',
+}
+
+def property_search_vector():
+    """Weighted tsvector expression over the searchable Property columns."""
+    vector = None
+    for field_name, weight in SEARCH_WEIGHTS.items():
+        part = SearchVector(field_name, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+# Amenity name (API) -> boolean column. The position is the bit in
+# Property.amenity_mask, so only ever append to this list.
+AMENITY_FIELDS = {
+    'power_backup': 'has_power_backup',
+    'lift': 'has_lift',
+    'swimming_pool': 'has_swimming_pool',
+    'club_house': 'has_club_house',
+    'gym': 'has_gym',
+    'park': 'has_park',
+    'reserved_parking': 'has_reserved_parking',
+    'security': 'has_security',
+    'vastu_compliant': 'is_vastu_compliant',
+    'intercom': 'has_intercom',
+    'piped_gas': 'has_piped_gas',
+    'wifi': 'has_wifi',
+    'drainage_line': 'has_drainage_line',
+    'one_gate_entry': 'has_one_gate_entry',
+    'jogging_park': 'has_jogging_park',
+    'children_park': 'has_children_park',
+    'temple': 'has_temple',
+    'water_line': 'has_water_line',
+    'street_light': 'has_street_light',
+    'internal_roads': 'has_internal_roads',
+}
+AMENITY_BITS = {name: 1 << i for i, name in enumerate(AMENITY_FIELDS)}
+
+def amenity_mask_for(names):
+    """Packs amenity names into a bitmask."""
+    mask = 0
+    for name in names:
+        mask |= AMENITY_BITS[name]
+    return mask
+
+def amenities_from_mask(mask):
+    """Unpacks a bitmask into the list of amenity names."""
+    return [name for name, bit in AMENITY_BITS.items() if mask & bit]
+
+# Denormalized columns recomputed in Property.save() -> the columns they derive from
+DERIVED_FIELDS = {
+    'geohash': {'latitude', 'longitude'},
+    'amenity_mask': set(AMENITY_FIELDS.values()),
+    'embedding': embeddings.SOURCE_FIELDS | set(AMENITY_FIELDS.values()),
+    'dedupe_signature': duplicates.SOURCE_FIELDS,
+    'dedupe_bands': duplicates.SOURCE_FIELDS,
+}
+
+class PropertyQuerySet(models.QuerySet):
+    _visibility_branches = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._visibility_branches = self._visibility_branches
+        return clone
+
+    @property
+    def visibility_branches(self):
+        """Disjoint Q objects whose OR is the visibility filter, or None."""
+        return self._visibility_branches
+
+    def visible_to(self, user):
+        """
+        Listings `user` may see: staff everything, authenticated users the
+        verified ones plus their own, everyone else verified only.
+
+        The owner case is an OR that no single index can serve in created_at
+        order, so its branches are kept on the queryset and
+        PropertyKeysetPagination runs them as a UNION ALL of index scans.
+        The branches never overlap, so no DISTINCT is needed.
+        """
+        verified = models.Q(verification_status='VERIFIED')
+        if user.is_staff:
+            return self.all()
+        if not user.is_authenticated:
+            return self.filter(verified)
+
+        own = models.Q(owner=user)
+        clone = self.filter(verified | own)
+        clone._visibility_branches = [verified, own & ~verified]
+        return clone
+
+    def with_active_mandate(self):
+        """
+        Annotates `active_mandate_pk` (id of an ACTIVE/PENDING mandate, or None)
+        so serializers don't need a mandate query per row.
+        """
+        from apps.mandates.models import Mandate
+        active = Mandate.objects.filter(
+            property_item=models.OuterRef('pk'),
+            status__in=Mandate.OPEN_STATUSES,
+        )
+        return self.annotate(active_mandate_pk=models.Subquery(active.values('id')[:1]))
+
+    def with_stats(self):
+        """
+        Annotates lifetime `total_views`, `total_saves` and `total_contact_reveals`
+        from PropertyStats, one correlated SUM each instead of a query per row.
+        """
+        totals = {}
+        for field in PropertyStats.COUNTER_FIELDS:
+            total = PropertyStats.objects.filter(property=models.OuterRef('pk')).order_by().values('property').annotate(
+                total=models.Sum(field)
+            ).values('total')
+            totals[f'total_{field}'] = Coalesce(models.Subquery(total), 0)
+        return self.annotate(**totals)
+
+    def with_saved(self, user):
+        """
+        Annotates `is_saved` (has `user` saved the listing) as one EXISTS per
+        row of the same query. Anonymous users get no annotation.
+        """
+        if not user.is_authenticated:
+            return self
+        saved = SavedProperty.objects.filter(user=user, property=models.OuterRef('pk'))
+        return self.annotate(is_saved=models.Exists(saved))
+
+    def for_listing(self):
+        """Everything PropertySerializer touches, loaded in a constant number of queries."""
+        return self.with_active_mandate().select_related('owner').prefetch_related('images', 'floor_plans')
+
+    def for_cards(self):
+        """What PropertyCardSerializer needs: images only, thumbnail first."""
+        return self.prefetch_related(models.Prefetch(
+            'images',
+            queryset=PropertyImage.objects.order_by('-is_thumbnail', 'order', 'id'),
+        ))
+
 class Property(models.Model):
     # --- Identifiers ---
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -87,6 +240,7 @@ class Property(models.Model):
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
     landmarks = models.TextField(blank=True, help_text="Nearby Schools, Metro, etc.")
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False, help_text="Derived from latitude/longitude on save")
 
     # --- 4. Floor & Building ---
     specific_floor = models.CharField(max_length=50, null=True, blank=True)
@@ -129,24 +283,27 @@ class Property(models.Model):
     has_street_light = models.BooleanField(default=False)
     has_internal_roads = models.BooleanField(default=False)
 
+    # Packed copy of the amenity booleans above (bit layout: AMENITY_FIELDS)
+    amenity_mask = models.IntegerField(default=0, editable=False)
+
     # --- 7. Media & Docs ---
     video_url = models.URLField(blank=True, null=True, help_text="YouTube/Hosted link")
     floor_plan = models.ImageField(upload_to='properties/floor_plans/', null=True, blank=True)
     
     # Verification Documents (Comprehensive List)
-    building_commencement_certificate = models.FileField(upload_to='properties/docs/', null=True, blank=False, max_length=255)
-    building_completion_certificate = models.FileField(upload_to='properties/docs/', null=True, blank=False, max_length=255)
-    layout_sanction = models.FileField(upload_to='properties/docs/', null=True, blank=False, max_length=255)
-    layout_order = models.FileField(upload_to='properties/docs/', null=True, blank=False, max_length=255)
-    na_order_or_gunthewari = models.FileField(upload_to='properties/docs/', null=True, blank=False, max_length=255)
-    mojani_nakasha = models.FileField(upload_to='properties/docs/', null=True, blank=False, max_length=255) # Renamed from doc_mojani
-    doc_7_12_or_pr_card = models.FileField(upload_to='properties/docs/', null=True, blank=False, max_length=255) # Renamed from doc_7_12
-    title_search_report = models.FileField(upload_to='properties/docs/', null=True, blank=False, max_length=255)
+    building_commencement_certificate = models.FileField(upload_to='properties/docs/', storage=media.document_storage, null=True, blank=False, max_length=255)
+    building_completion_certificate = models.FileField(upload_to='properties/docs/', storage=media.document_storage, null=True, blank=False, max_length=255)
+    layout_sanction = models.FileField(upload_to='properties/docs/', storage=media.document_storage, null=True, blank=False, max_length=255)
+    layout_order = models.FileField(upload_to='properties/docs/', storage=media.document_storage, null=True, blank=False, max_length=255)
+    na_order_or_gunthewari = models.FileField(upload_to='properties/docs/', storage=media.document_storage, null=True, blank=False, max_length=255)
+    mojani_nakasha = models.FileField(upload_to='properties/docs/', storage=media.document_storage, null=True, blank=False, max_length=255) # Renamed from doc_mojani
+    doc_7_12_or_pr_card = models.FileField(upload_to='properties/docs/', storage=media.document_storage, null=True, blank=False, max_length=255) # Renamed from doc_7_12
+    title_search_report = models.FileField(upload_to='properties/docs/', storage=media.document_storage, null=True, blank=False, max_length=255)
     
     # Optional Verification Documents
-    rera_project_certificate = models.FileField(upload_to='properties/docs/', null=True, blank=True, max_length=255)
-    gst_registration = models.FileField(upload_to='properties/docs/', null=True, blank=True, max_length=255)
-    sale_deed_registration_copy = models.FileField(upload_to='properties/docs/', null=True, blank=True, max_length=255)
+    rera_project_certificate = models.FileField(upload_to='properties/docs/', storage=media.document_storage, null=True, blank=True, max_length=255)
+    gst_registration = models.FileField(upload_to='properties/docs/', storage=media.document_storage, null=True, blank=True, max_length=255)
+    sale_deed_registration_copy = models.FileField(upload_to='properties/docs/', storage=media.document_storage, null=True, blank=True, max_length=255)
 
     # --- 8. Contact Info ---
     listed_by = models.CharField(max_length=20, choices=[
@@ -165,16 +322,122 @@ class Property(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = PropertyQuerySet.as_manager()
+
+    # Maintained full-text index over SEARCH_WEIGHTS columns (see save())
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Feature vector for "similar properties" (see embeddings.py)
+    embedding = VectorField(dimensions=embeddings.DIMENSIONS, null=True, blank=True, editable=False)
+    # Address MinHash and its LSH band hashes, for duplicate detection (see duplicates.py)
+    dedupe_signature = ArrayField(models.BigIntegerField(), default=list, blank=True, editable=False)
+    dedupe_bands = ArrayField(models.BigIntegerField(), default=list, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='property_search_vector_gin'),
+            GinIndex(fields=['dedupe_bands'], name='property_dedupe_bands_gin'),
+            # Prefix (LIKE 'abc%') scans for radius search and map clustering
+            models.Index(fields=['geohash'], name='property_geohash_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['latitude', 'longitude'], name='property_lat_lng_idx'),
+            # Public feed in the keyset orders (id is the tiebreaker), and the
+            # common search filters
+            models.Index(
+                models.F('created_at').desc(), models.F('id').desc(), name='property_verified_recent_idx',
+                condition=models.Q(verification_status='VERIFIED'),
+            ),
+            models.Index(
+                fields=['total_price', 'id'], name='property_verified_price_idx',
+                condition=models.Q(verification_status='VERIFIED'),
+            ),
+            # City is matched with icontains, which no B-tree can serve, so
+            # it is filtered on the rows this index returns
+            models.Index(
+                fields=['property_type', 'total_price'], name='property_verified_type_idx',
+                condition=models.Q(verification_status='VERIFIED'),
+            ),
+            # my_listings and the owner branch of the visibility query
+            models.Index(fields=['owner', '-created_at'], name='property_owner_recent_idx'),
+            HnswIndex(
+                fields=['embedding'], name='property_embedding_hnsw',
+                m=16, ef_construction=64, opclasses=['vector_l2_ops'],
+                condition=models.Q(verification_status='VERIFIED'),
+            ),
+        ]
+
+    # Document / floor plan uploads stored on the row itself
+    FILE_FIELDS = [
+        'floor_plan',
+        'building_commencement_certificate',
+        'building_completion_certificate',
+        'layout_sanction',
+        'layout_order',
+        'na_order_or_gunthewari',
+        'mojani_nakasha',
+        'doc_7_12_or_pr_card',
+        'title_search_report',
+        'rera_project_certificate',
+        'gst_registration',
+        'sale_deed_registration_copy',
+    ]
+    # Stored content-addressed and reference-counted (apps/properties/media.py)
+    DOCUMENT_FIELDS = FILE_FIELDS[1:]
+
     def save(self, *args, **kwargs):
         # Auto-calculation logic removed to allow manual entry
+        update_fields = kwargs.get('update_fields')
+        self.compute_derived_fields()
+
+        # Derived columns follow their source columns into partial saves
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            for derived, sources in DERIVED_FIELDS.items():
+                if sources & update_fields:
+                    update_fields.add(derived)
+            kwargs['update_fields'] = update_fields
+
         super().save(*args, **kwargs)
 
+        if update_fields is None or set(update_fields) & set(SEARCH_WEIGHTS):
+            self.refresh_search_vector()
+
+    def compute_derived_fields(self):
+        """
+        Fills the DERIVED_FIELDS columns from the source columns. save() calls
+        it; bulk_create() callers must call it themselves.
+        """
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        self.amenity_mask = self.compute_amenity_mask()
+        self.embedding = embeddings.build_embedding(self)
+        self.dedupe_signature, self.dedupe_bands = duplicates.build_signature(self)
+
+    def compute_amenity_mask(self):
+        return amenity_mask_for(
+            name for name, field_name in AMENITY_FIELDS.items() if getattr(self, field_name)
+        )
+
+    @property
+    def amenities(self):
+        return amenities_from_mask(self.amenity_mask)
+
+    def refresh_search_vector(self):
+        """Recomputes the tsvector in the database from the saved column values."""
+        Property.objects.filter(pk=self.pk).update(search_vector=property_search_vector())
+
 
 
 class PropertyImage(models.Model):
     property = models.ForeignKey(Property, related_name='images', on_delete=models.CASCADE)
     image = models.ImageField(upload_to='properties/')
     is_thumbnail = models.BooleanField(default=False)
+    order = models.IntegerField(default=0, help_text="Display order")
+    # Resized WebP/JPEG copies, see apps/properties/images.py
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta:
+        ordering = ['order', 'id']
 
 class PropertyFloorPlan(models.Model):
     property = models.ForeignKey(Property, related_name='floor_plans', on_delete=models.CASCADE)
@@ -183,12 +446,159 @@ class PropertyFloorPlan(models.Model):
     floor_name = models.CharField(max_length=100, blank=True, help_text="Floor name/description")
     order = models.IntegerField(default=0, help_text="Display order")
     created_at = models.DateTimeField(auto_now_add=True)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ['order', 'floor_number']
         verbose_name = 'Floor Plan'
         verbose_name_plural = 'Floor Plans'
 
+class PropertyImport(models.Model):
+    """
+    A bulk listing import (apps/properties/imports.py). Rows are inserted
+    synchronously; media from the zip archive is attached afterwards, and
+    `pending_media` holds what is still to be attached per created listing.
+    """
+    STATUS_CHOICES = [
+        ('IMPORTING', 'Importing'),
+        ('PROCESSING_MEDIA', 'Processing Media'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='property_imports')
+    source_name = models.CharField(max_length=255)
+    media = models.FileField(upload_to='properties/imports/', null=True, blank=True, max_length=255)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='IMPORTING')
+    total_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    # [{"row": 7, "errors": {...}}], spreadsheet row numbers (header is row 1)
+    errors = models.JSONField(default=list, blank=True)
+    # [{"row": 7, "property": "<uuid>", "files": {field: path}, "images": [path, ...]}]
+    pending_media = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.source_name} ({self.get_status_display()})"
+
+class MediaBlob(models.Model):
+    """
+    One stored document in media.document_storage, shared by every file
+    field holding the same bytes. `ref_count` is how many do.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+class PropertyStats(models.Model):
+    """
+    Daily engagement counters for a listing. Increments are buffered per
+    process and added here in batches (apps/properties/activity.py), so the
+    hot Property row is never updated for them.
+    """
+    COUNTER_FIELDS = ['views', 'saves', 'contact_reveals']
+
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    saves = models.PositiveIntegerField(default=0)
+    contact_reveals = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'date'], name='propertystats_property_date_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='propertystats_date_idx'),
+        ]
+        verbose_name_plural = 'Property stats'
+
+    def __str__(self):
+        return f"{self.property_id} {self.date}"
+
+class LocalityPriceStats(models.Model):
+    """
+    Monthly price rollup of VERIFIED listings per locality and kind,
+    maintained incrementally by apps/properties/market.py.
+    """
+    city = models.CharField(max_length=100)
+    locality = models.CharField(max_length=255)
+    property_type = models.CharField(max_length=50)
+    listing_type = models.CharField(max_length=10)
+    month = models.DateField(help_text="First day of the month the listings were created in")
+    count = models.IntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    # Log-bucketed histograms (market.PRICE_BUCKETS / market.PPSF_BUCKETS cells)
+    price_histogram = ArrayField(models.IntegerField(), default=list)
+    ppsf_histogram = ArrayField(models.IntegerField(), default=list)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['city', 'locality', 'property_type', 'listing_type', 'month'],
+                name='localitypricestats_key_uniq',
+            ),
+        ]
+        verbose_name_plural = 'Locality price stats'
+
+    def __str__(self):
+        return f"{self.locality}, {self.city} {self.property_type}/{self.listing_type} {self.month:%Y-%m}"
+
+class PendingFileDeletion(models.Model):
+    """A stored file to delete, queued by a post_delete receiver (apps/properties/deletions.py)."""
+    STORAGE_CHOICES = [
+        ('default', 'Default'),
+        ('documents', 'Content-addressed documents'),
+    ]
+
+    name = models.CharField(max_length=500)
+    storage = models.CharField(max_length=20, choices=STORAGE_CHOICES, default='default')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return self.name
+
+class ChunkedUpload(models.Model):
+    """
+    A large document sent in chunks (apps/properties/uploads.py). Once
+    COMPLETE, its stored file can be attached to a Property file field by
+    passing the upload's id instead of the file; it is then ATTACHED.
+    """
+    STATUS_CHOICES = [
+        ('UPLOADING', 'Uploading'),
+        ('COMPLETE', 'Complete'),
+        ('ATTACHED', 'Attached'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='chunked_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField(help_text="Total size in bytes, declared when the upload starts")
+    received = models.BigIntegerField(default=0)
+    file = models.FileField(upload_to='properties/docs/', storage=media.document_storage, max_length=255, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='UPLOADING')
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.get_status_display()})"
+
 # --- User Interactions ---
 class SavedProperty(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -199,34 +609,184 @@ class SavedProperty(models.Model):
         unique_together = ('user', 'property')
 
 class RecentlyViewed(models.Model):
+    """
+    A user's last view of a property, written in batches by
+    apps/properties/activity.py and capped per user.
+    """
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     property = models.ForeignKey(Property, on_delete=models.CASCADE)
-    viewed_at = models.DateTimeField(auto_now=True)
+    viewed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'property'], name='recentlyviewed_user_property_uniq'),
+        ]
+        indexes = [
+            models.Index(models.F('user'), models.F('viewed_at').desc(), name='recentlyviewed_user_recent_idx'),
+        ]
+
+class PropertyDuplicate(models.Model):
+    """
+    A listing flagged as a probable duplicate of another one, with the
+    score and its components (apps/properties/duplicates.py).
+    """
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='duplicate_flags')
+    duplicate_of = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    components = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'duplicate_of'], name='propertyduplicate_pair_uniq'),
+        ]
+
+class SavedSearch(models.Model):
+    """
+    A buyer's stored listing search: normalized PropertyFilter parameters,
+    plus the criteria copied into indexed columns so a newly verified listing
+    only has to be checked against the searches that could match it
+    (apps/properties/saved_searches.py). Blank / NULL means "any".
+    """
+    FREQUENCY_CHOICES = [
+        ('INSTANT', 'Instant'),
+        ('DAILY', 'Daily digest'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100)
+    params = models.JSONField(default=dict)
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default='INSTANT')
+
+    # Index keys, derived from params on save; `city` is lower-cased and matched
+    # as a substring of the listing's city, like PropertyFilter.city
+    city = models.CharField(max_length=100, blank=True, default='')
+    property_type = models.CharField(max_length=50, blank=True, default='')
+    min_price = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    max_price = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['city', 'property_type'], name='savedsearch_city_type_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.user})"
+
+    def save(self, *args, **kwargs):
+        self.city = (self.params.get('city') or '').strip().lower()
+        self.property_type = self.params.get('property_type') or ''
+        self.min_price = self.params.get('min_price') or None
+        self.max_price = self.params.get('max_price') or None
+        super().save(*args, **kwargs)
+
+class SavedSearchMatch(models.Model):
+    """A listing that matched a saved search; `notified` once the user has been told."""
+    search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches')
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='+')
+    notified = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['search', 'property'], name='savedsearchmatch_search_property_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['search'], condition=models.Q(notified=False), name='savedsearchmatch_pending_idx'),
+        ]
 
 @receiver(post_delete, sender=PropertyImage)
 def delete_image_file(sender, instance, **kwargs):
-    """Deletes physical image files from storage when the database record is deleted."""
+    """Queues the image and its variants for deletion once the database record is gone."""
     if instance.image:
-        instance.image.delete(save=False)
+        deletions.enqueue([instance.image.name, *images.variant_names(instance.variants)])
+
+@receiver(post_delete, sender=PropertyFloorPlan)
+def delete_floor_plan_variants(sender, instance, **kwargs):
+    deletions.enqueue(images.variant_names(instance.variants))
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_save, sender=PropertyFloorPlan)
+def schedule_image_variants(sender, instance, **kwargs):
+    """Builds the resized copies of a new or replaced image after the upload commits."""
+    if instance.image and not images.variants_ready(instance):
+        images.generate_variants_in_background(sender, [instance.pk])
 
 @receiver(post_delete, sender=Property)
 def delete_property_files(sender, instance, **kwargs):
-    """Deletes all document files and floor plans when a Property record is deleted."""
-    file_fields = [
-        'floor_plan',
-        'building_commencement_certificate',
-        'building_completion_certificate',
-        'layout_sanction',
-        'layout_order',
-        'na_order_or_gunthewari',
-        'mojani_nakasha',
-        'doc_7_12_or_pr_card',
-        'title_search_report',
-        'rera_project_certificate',
-        'gst_registration',
-        'sale_deed_registration_copy'
-    ]
-    for field_name in file_fields:
-        file_field = getattr(instance, field_name)
-        if file_field:
-            file_field.delete(save=False)
\ No newline at end of file
+    """Queues the floor plan for deletion and releases the documents when a Property record is deleted."""
+    if instance.floor_plan:
+        deletions.enqueue([instance.floor_plan.name])
+    # Documents may be shared with other listings; media.release() deletes the unreferenced ones
+    media.release(media.field_names(instance, Property.DOCUMENT_FIELDS).values())
+
+@receiver(pre_save, sender=Property)
+def remember_document_names(sender, instance, update_fields=None, **kwargs):
+    """Loads the stored document names so post_save can tell which ones changed."""
+    instance._stored_documents = {}
+    # New uploads: document_storage.save() counts these as it stores them
+    instance._uploaded_documents = {
+        field for field in Property.DOCUMENT_FIELDS
+        if getattr(instance, field) and not getattr(instance, field)._committed
+    }
+    if instance._state.adding:
+        return
+    fields = Property.DOCUMENT_FIELDS
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    if fields:
+        stored = Property.objects.filter(pk=instance.pk).values(*fields).first() or {}
+        instance._stored_documents = {field: name or None for field, name in stored.items()}
+
+@receiver(post_save, sender=Property)
+def count_document_references(sender, instance, **kwargs):
+    """Retains newly attached stored documents and releases replaced or cleared ones."""
+    previous = getattr(instance, '_stored_documents', {})
+    uploaded = getattr(instance, '_uploaded_documents', set())
+    current = media.field_names(instance, previous or Property.DOCUMENT_FIELDS)
+    if previous or kwargs['created']:
+        fields = previous.keys() if previous else current.keys()
+        changed = [field for field in fields if previous.get(field) != current.get(field)]
+        media.retain(current.get(field) for field in changed if field not in uploaded)
+        media.release(previous.get(field) for field in changed)
+    instance._stored_documents = {}
+    instance._uploaded_documents = set()
+
+@receiver(pre_save, sender=Property)
+def remember_market_contribution(sender, instance, update_fields=None, **kwargs):
+    """Loads what the stored row adds to the price rollup, so post_save can move it."""
+    instance._stored_market = None
+    if instance._state.adding or (update_fields is not None and not set(update_fields) & market.SOURCE_FIELDS):
+        return
+    stored = Property.objects.filter(pk=instance.pk).only('created_at', *market.SOURCE_FIELDS).first()
+    instance._stored_market = market.contribution(stored) if stored else None
+
+@receiver(post_save, sender=Property)
+def update_market_stats(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or set(update_fields) & market.SOURCE_FIELDS:
+        market.apply(getattr(instance, '_stored_market', None), market.contribution(instance))
+    instance._stored_market = None
+
+@receiver(post_delete, sender=Property)
+def remove_market_stats(sender, instance, **kwargs):
+    market.apply(market.contribution(instance), None)
+
+@receiver(post_save, sender=Property)
+def flag_duplicate_listings(sender, instance, created, update_fields=None, **kwargs):
+    """Re-runs duplicate detection when the address, location, price or area may have changed."""
+    if created or update_fields is None or set(update_fields) & duplicates.SCORED_FIELDS:
+        duplicates.flag(instance)
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+@receiver(post_save, sender=PropertyFloorPlan)
+@receiver(post_delete, sender=PropertyFloorPlan)
+def invalidate_listing_cache(sender, instance, **kwargs):
+    """Any change to listing data retires every cached public listing response."""
+    bump_listing_generation_on_commit()
@@ -0,0 +1,239 @@
+import base64
+import json
+import uuid
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PropertyKeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination for property listings.
+
+    Pages are addressed by an opaque cursor holding the sort value and id of
+    the boundary row, so page N costs the same index range scan as page 1
+    instead of an OFFSET scan. The `id` tiebreaker keeps the order stable
+    when many rows share a price, area or timestamp.
+
+    Pagination is opt-in: it only kicks in when the client sends `cursor`
+    or `page_size`, so existing callers keep receiving a plain list.
+
+    Usage: /api/properties/?page_size=20&ordering=-total_price
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering_param = 'ordering'
+    default_ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    # Public ordering name -> parser for the cursor value
+    ordering_fields = {
+        'created_at': parse_datetime,
+        'total_price': Decimal,
+        'super_builtup_area': Decimal,
+        'search_rank': int,
+        'distance_m': int,
+    }
+
+    # Annotations that replace the default ordering when present, by priority
+    annotated_orderings = ['distance_m', '-search_rank']
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset)
+
+        field, descending = self._split(self.ordering)
+        nullable = self._is_nullable(queryset, field)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['reverse'])
+
+        if cursor:
+            queryset = queryset.filter(
+                self._seek(field, descending, reverse, nullable, cursor['value'], cursor['pk'])
+            )
+        order_by = self._order_by(field, descending, reverse, nullable)
+
+        rows = list(self._slice(queryset, order_by, self.page_size + 1))
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = rows
+        self.field = field
+        return rows
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, request, queryset):
+        """
+        Returns the requested ordering if it is allowed. Otherwise nearby
+        and search results keep their distance/relevance order and
+        everything else falls back to the default.
+        """
+        annotations = queryset.query.annotations
+        ordering = request.query_params.get(self.ordering_param, '').strip()
+        field = ordering.lstrip('-')
+        if field in self.ordering_fields and self._is_orderable(queryset, field):
+            return ordering
+
+        for default in self.annotated_orderings:
+            if default.lstrip('-') in annotations:
+                return default
+        return self.default_ordering
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    # --- Cursor encoding ---
+
+    def encode_cursor(self, row, reverse):
+        value = getattr(row, self.field)
+        payload = {
+            'o': self.ordering,
+            'v': None if value is None else str(value),
+            'pk': str(row.pk),
+            'r': int(reverse),
+        }
+        raw = json.dumps(payload, separators=(',', ':')).encode('ascii')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            # A cursor is only meaningful for the ordering it was issued under
+            if payload['o'] != self.ordering:
+                raise NotFound(self.invalid_cursor_message)
+            value = payload['v']
+            if value is not None:
+                field, _ = self._split(payload['o'])
+                value = self.ordering_fields[field](value)
+            cursor = {'value': value, 'pk': uuid.UUID(payload['pk']), 'reverse': bool(payload['r'])}
+        except (TypeError, ValueError, KeyError, AttributeError, InvalidOperation):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def _link(self, row, reverse):
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        url = replace_query_param(url, self.ordering_param, self.ordering)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    # --- Query building ---
+
+    @staticmethod
+    def _split(ordering):
+        return ordering.lstrip('-'), ordering.startswith('-')
+
+    @staticmethod
+    def _is_orderable(queryset, field):
+        if field in queryset.query.annotations:
+            return True
+        try:
+            queryset.model._meta.get_field(field)
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    @staticmethod
+    def _is_nullable(queryset, field):
+        try:
+            return queryset.model._meta.get_field(field).null
+        except FieldDoesNotExist:
+            return False
+
+    @staticmethod
+    def _order_by(field, descending, reverse, nullable=True):
+        """
+        Rows with a NULL sort value always trail the forward ordering. NOT NULL
+        columns get a bare ASC/DESC so a plain index on them can serve the sort.
+        """
+        if not nullable:
+            nulls = {}
+        elif reverse:
+            nulls = {'nulls_first': True}
+        else:
+            nulls = {'nulls_last': True}
+        if descending != reverse:
+            return [F(field).desc(**nulls), '-pk']
+        return [F(field).asc(**nulls), 'pk']
+
+    @staticmethod
+    def _slice(queryset, order_by, limit):
+        """
+        The first `limit` rows in `order_by` order. A visibility OR (see
+        PropertyQuerySet.visible_to) becomes a UNION ALL of its branches,
+        each limited on its own index, so the database merges a few rows
+        per branch instead of sorting every visible row.
+        """
+        branches = getattr(queryset, 'visibility_branches', None)
+        if not branches:
+            return queryset.order_by(*order_by)[:limit]
+
+        parts = [queryset.filter(branch).order_by(*order_by)[:limit] for branch in branches]
+        return parts[0].union(*parts[1:], all=True).order_by(*order_by)[:limit]
+
+    @staticmethod
+    def _seek(field, descending, reverse, nullable, value, pk):
+        """Rows strictly after (value, pk) in the direction being walked."""
+        op = 'lt' if descending != reverse else 'gt'
+
+        if value is None:
+            # Boundary row sits in the NULL tail
+            seek = Q(**{f'{field}__isnull': True, f'pk__{op}': pk})
+            if reverse:
+                seek |= Q(**{f'{field}__isnull': False})
+            return seek
+
+        seek = Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+        if nullable and not reverse:
+            seek |= Q(**{f'{field}__isnull': True})
+        return seek
@@ -0,0 +1,189 @@
+"""
+New-listing alerts for saved searches.
+
+When listings become VERIFIED, match_in_background() finds the saved
+searches they satisfy without evaluating every search:
+1. Candidates come from the indexed SavedSearch columns (city,
+   property_type, price band), one lookup per listing.
+2. Each distinct parameter set among the candidates runs through
+   PropertyFilter once, against the whole batch of listings.
+Hits are recorded as SavedSearchMatch rows, so a listing is announced to a
+search at most once even if it is re-approved. INSTANT searches get one
+Notification per hit, DAILY searches one per day from
+`manage.py send_search_digests`. All Notification rows go in with
+bulk_create.
+
+The city criterion keeps PropertyFilter's icontains semantics: a search
+for `pune` matches "Pune City" too. The listing's city is expanded into all
+of its substrings, and the searches whose city is one of them are looked up
+through the index.
+"""
+import logging
+import threading
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from django.template.defaultfilters import pluralize
+
+logger = logging.getLogger(__name__)
+
+MAX_SAVED_SEARCHES = 20
+
+
+def normalize_params(data):
+    """
+    The PropertyFilter parameters in `data`, stripped of empty values and
+    sorted. Raises ValueError for unknown parameters and
+    django_filters/DRF validation errors for invalid values.
+    """
+    from .models import Property
+    from .views import PropertyFilter
+
+    params = {key: str(value).strip() for key, value in data.items() if str(value).strip()}
+    unknown = sorted(set(params) - set(PropertyFilter.base_filters))
+    if unknown:
+        raise ValueError(f"Unknown search parameters {unknown}. Valid ones are: {sorted(PropertyFilter.base_filters)}")
+
+    filterset = PropertyFilter(params, queryset=Property.objects.none())
+    if not filterset.is_valid():
+        raise ValueError(filterset.errors)
+    # Runs the method filters (near, bbox, amenities), which do their own checks
+    filterset.qs
+    return dict(sorted(params.items()))
+
+
+def city_keys(city):
+    """Lower-cased substrings of `city`: the saved city criteria it contains."""
+    city = (city or '').lower()
+    return {city[start:end] for start in range(len(city)) for end in range(start + 1, len(city) + 1)}
+
+
+def candidate_searches(property_obj):
+    """Searches whose indexed criteria admit `property_obj`."""
+    from .models import SavedSearch
+
+    price = property_obj.total_price
+    return SavedSearch.objects.filter(
+        Q(city='') | Q(city__in=city_keys(property_obj.city)),
+        Q(property_type='') | Q(property_type=property_obj.property_type),
+        Q(min_price__isnull=True) | Q(min_price__lte=price),
+        Q(max_price__isnull=True) | Q(max_price__gte=price),
+    ).exclude(user_id=property_obj.owner_id)
+
+
+def find_matches(property_ids):
+    """[(search, property)] for the VERIFIED listings among `property_ids`."""
+    from .models import Property
+    from .views import PropertyFilter
+
+    listings = {p.pk: p for p in Property.objects.filter(pk__in=property_ids, verification_status='VERIFIED')}
+    if not listings:
+        return []
+
+    candidates = {}
+    for listing in listings.values():
+        for search in candidate_searches(listing):
+            candidates.setdefault(search.pk, (search, set()))[1].add(listing.pk)
+
+    # Searches sharing a parameter set are checked together
+    groups = {}
+    for search, pks in candidates.values():
+        key = tuple(sorted(search.params.items()))
+        groups.setdefault(key, []).append((search, pks))
+
+    matches = []
+    for key, searches in groups.items():
+        batch = set().union(*(pks for _, pks in searches))
+        filterset = PropertyFilter(dict(key), queryset=Property.objects.filter(pk__in=batch))
+        try:
+            matched = set(filterset.qs.values_list('pk', flat=True)) if filterset.is_valid() else set()
+        except Exception:
+            logger.exception("Saved search parameters %s could not be evaluated", dict(key))
+            continue
+        for search, pks in searches:
+            matches.extend((search, listings[pk]) for pk in pks & matched)
+    return matches
+
+
+def notify_matches(property_ids):
+    """Records new matches and notifies INSTANT searches. Returns the number of new matches."""
+    from apps.notifications.models import Notification
+    from .models import SavedSearchMatch
+
+    matches = {(search.pk, listing.pk): (search, listing) for search, listing in find_matches(property_ids)}
+    if not matches:
+        return 0
+
+    table = SavedSearchMatch._meta.db_table
+    rows = ', '.join(['(%s, %s, %s, now())'] * len(matches))
+    params = [
+        value for search, listing in matches.values()
+        for value in (search.pk, listing.pk, search.frequency == 'INSTANT')
+    ]
+    with transaction.atomic():
+        # Only the rows inserted here come back: a listing re-approved, or
+        # matched by an overlapping run, was already announced
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (search_id, property_id, notified, created_at) VALUES {rows} '
+                f'ON CONFLICT (search_id, property_id) DO NOTHING RETURNING search_id, property_id',
+                params,
+            )
+            new = [matches[key] for key in cursor.fetchall()]
+        Notification.objects.bulk_create([
+            Notification(
+                recipient_id=search.user_id,
+                title=f"New listing for '{search.name}'",
+                message=f"{listing.title} in {listing.locality or listing.city} matches your saved search.",
+                action_url=f"/property/{listing.pk}",
+            )
+            for search, listing in new if search.frequency == 'INSTANT'
+        ])
+    return len(new)
+
+
+def match_in_background(property_ids):
+    """Runs notify_matches() in a thread once the transaction commits."""
+    property_ids = list(property_ids)
+    if not property_ids:
+        return
+
+    def start():
+        threading.Thread(target=_match_job, args=(property_ids,), daemon=True).start()
+    transaction.on_commit(start)
+
+
+def _match_job(property_ids):
+    try:
+        notify_matches(property_ids)
+    except Exception:
+        logger.exception("Matching saved searches for %s failed", property_ids)
+    finally:
+        connections.close_all()
+
+
+def send_digests():
+    """One Notification per DAILY search with unannounced matches. Returns the number sent."""
+    from apps.notifications.models import Notification
+    from .models import SavedSearch, SavedSearchMatch
+
+    pending = list(SavedSearchMatch.objects.filter(notified=False, search__frequency='DAILY').values_list('pk', 'search_id'))
+    if not pending:
+        return 0
+    counts = Counter(search_id for _, search_id in pending)
+
+    with transaction.atomic():
+        Notification.objects.bulk_create([
+            Notification(
+                recipient_id=search.user_id,
+                title=f"{counts[search.pk]} new listing{pluralize(counts[search.pk])} for '{search.name}'",
+                message="Listings matching your saved search went live since the last digest.",
+                action_url=f"/search?{urlencode(search.params)}",
+            )
+            for search in SavedSearch.objects.filter(pk__in=counts)
+        ])
+        # Only the matches counted above; newer ones wait for the next digest
+        SavedSearchMatch.objects.filter(pk__in=[pk for pk, _ in pending]).update(notified=True)
+    return len(counts)
@@ -0,0 +1,62 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, IntegerField
+from django.db.models.functions import Cast
+from rest_framework import filters
+
+from .models import SEARCH_CONFIG
+
+# ts_rank returns a float; scaling it to an integer keeps it usable as a keyset cursor
+RANK_SCALE = 1000000
+
+
+class PropertySearchFilter(filters.SearchFilter):
+    """
+    Full-text search over the maintained `Property.search_vector` column.
+
+    Replaces the default `icontains` scans with a single GIN index lookup.
+    Every word is prefix-matched so partial input ("wak" -> "Wakad") still
+    hits. Matches are annotated with `search_rank`, which
+    PropertyOrderingFilter uses unless the client asks for an explicit
+    `ordering`.
+
+    Usage: /api/properties/?search=2bhk baner
+    """
+
+    def get_search_query(self, request):
+        words = []
+        for term in self.get_search_terms(request):
+            words.extend(re.findall(r'\w+', term))
+        if not words:
+            return None
+
+        raw = ' & '.join(f'{word}:*' for word in words)
+        return SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_search_query(request)
+        if query is None:
+            return queryset
+
+        rank = Cast(SearchRank(F('search_vector'), query) * RANK_SCALE, IntegerField())
+        return queryset.filter(search_vector=query).annotate(search_rank=rank)
+
+
+class PropertyOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that falls back to distance (near=) or relevance
+    (search=) ordering when the queryset carries those annotations and the
+    client did not pick an ordering.
+    """
+    annotated_orderings = [
+        ('distance_m', ['distance_m']),
+        ('search_rank', ['-search_rank', '-created_at']),
+    ]
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param):
+            for annotation, ordering in self.annotated_orderings:
+                if annotation in queryset.query.annotations:
+                    return ordering
+        return super().get_ordering(request, queryset, view)
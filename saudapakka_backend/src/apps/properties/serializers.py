@@ -1,18 +1,144 @@
-from rest_framework import serializers
-from .models import Property, PropertyImage, PropertyFloorPlan
+import uuid
+
+from django.db import models, transaction
+from rest_framework import serializers, permissions
+from .models import Property, PropertyImage, PropertyFloorPlan, PropertyImport, ChunkedUpload, SavedSearch
+from . import images as image_variants, media, saved_searches, uploads
 from apps.users.serializers import UserSerializer, PublicUserSerializer
 
-class PropertyImageSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """
+    Lets read requests trim the response with ?fields=a,b or ?omit=c,d.
+    Only the top-level serializer is trimmed; nested serializers keep their shape.
+    """
+    fields_param = 'fields'
+    omit_param = 'omit'
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in permissions.SAFE_METHODS or not self._is_top_level():
+            return fields
+
+        only = self._param_list(request, self.fields_param)
+        omit = self._param_list(request, self.omit_param)
+        if only:
+            fields = {name: field for name, field in fields.items() if name in only}
+        for name in omit:
+            fields.pop(name, None)
+        return fields
+
+    def _is_top_level(self):
+        parent = self.parent
+        if parent is None:
+            return True
+        return isinstance(parent, serializers.ListSerializer) and parent.parent is None
+
+    @staticmethod
+    def _param_list(request, name):
+        value = request.query_params.get(name, '')
+        return {part.strip() for part in value.split(',') if part.strip()}
+
+class ImageVariantsMixin:
+    """
+    Adds the resized copies of `image` (apps/properties/images.py):
+        srcset:        {"webp": "<url> 320w, <url> 640w", "jpeg": "..."}, null until built
+        thumbnail_url: smallest JPEG copy, or the original until the copies exist
+    """
+    def get_srcset(self, obj):
+        if not image_variants.variants_ready(obj):
+            return None
+        return {
+            key: ', '.join(
+                f"{self._url(obj, name)} {width}w"
+                for width, name in sorted(obj.variants[key].items(), key=lambda item: int(item[0]))
+            )
+            for key in image_variants.FORMATS
+        }
+
+    def get_thumbnail_url(self, obj):
+        if not obj.image:
+            return None
+        if not image_variants.variants_ready(obj):
+            return self._url(obj, obj.image.name)
+        jpeg = obj.variants['jpeg']
+        return self._url(obj, jpeg[min(jpeg, key=int)])
+
+    def _url(self, obj, name):
+        url = obj.image.storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+class PropertyImageSerializer(ImageVariantsMixin, serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+
     class Meta:
         model = PropertyImage
-        fields = ['id', 'image', 'is_thumbnail']
+        fields = ['id', 'image', 'is_thumbnail', 'order', 'srcset', 'thumbnail_url']
+
+class PropertyImageBatchSerializer(serializers.Serializer):
+    """
+    A multipart gallery upload of several images at once.
+    `thumbnail` is the index of the cover image within `images`; `order`,
+    if given, holds one display position per image (default: appended
+    after the existing gallery in upload order).
+    """
+    MAX_IMAGES = 30
+
+    images = serializers.ListField(child=serializers.ImageField(), allow_empty=False, max_length=MAX_IMAGES)
+    thumbnail = serializers.IntegerField(min_value=0, required=False)
+    order = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, data):
+        count = len(data['images'])
+        if data.get('thumbnail') is not None and data['thumbnail'] >= count:
+            raise serializers.ValidationError({'thumbnail': f"Must be an index below {count}."})
+        if 'order' in data and len(data['order']) != count:
+            raise serializers.ValidationError({'order': f"Expected {count} positions, one per image."})
+        return data
+
+class PropertyFloorPlanSerializer(ImageVariantsMixin, serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
 
-class PropertyFloorPlanSerializer(serializers.ModelSerializer):
     class Meta:
         model = PropertyFloorPlan
-        fields = ['id', 'image', 'floor_number', 'floor_name', 'order', 'created_at']
+        fields = ['id', 'image', 'floor_number', 'floor_name', 'order', 'created_at', 'srcset', 'thumbnail_url']
+
+class UploadedFileField(serializers.FileField):
+    """
+    A file field that also accepts the id of one of the user's COMPLETE
+    chunked uploads (apps/properties/uploads.py) instead of the file.
+    The upload is validated here and attached by PropertySerializer.save().
+    """
+    default_error_messages = {
+        **serializers.FileField.default_error_messages,
+        'invalid_upload': 'No completed upload with this id.',
+    }
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            return super().to_internal_value(data)
+
+        request = self.context.get('request')
+        try:
+            upload_id = uuid.UUID(data)
+        except ValueError:
+            self.fail('invalid_upload')
+        if request is None or not request.user.is_authenticated:
+            self.fail('invalid_upload')
+        upload = ChunkedUpload.objects.filter(pk=upload_id, owner=request.user, status='COMPLETE').first()
+        if upload is None:
+            self.fail('invalid_upload')
+        return upload
+
+class PropertySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FileField: UploadedFileField,
+    }
 
-class PropertySerializer(serializers.ModelSerializer):
     # --- Nested Representations ---
     images = PropertyImageSerializer(many=True, read_only=True)
     floor_plans = PropertyFloorPlanSerializer(many=True, read_only=True)
@@ -31,6 +157,16 @@ class PropertySerializer(serializers.ModelSerializer):
     has_mojani = serializers.SerializerMethodField()
     has_active_mandate = serializers.SerializerMethodField()
     active_mandate_id = serializers.SerializerMethodField()
+    # Amenity names unpacked from Property.amenity_mask
+    amenities = serializers.ListField(child=serializers.CharField(), read_only=True)
+    # Only present on near= queries (annotated by PropertyFilter)
+    distance_m = serializers.IntegerField(read_only=True)
+    # Only present on my_listings (annotated by PropertyQuerySet.with_stats)
+    total_views = serializers.IntegerField(read_only=True)
+    total_saves = serializers.IntegerField(read_only=True)
+    total_contact_reveals = serializers.IntegerField(read_only=True)
+    # Only for authenticated users (annotated by PropertyQuerySet.with_saved)
+    is_saved = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Property
@@ -49,7 +185,10 @@ class PropertySerializer(serializers.ModelSerializer):
 
             # Location
             'address_line', 'locality', 'city', 'pincode', 'latitude', 
-            'longitude', 'landmarks',
+            'longitude', 'landmarks', 'distance_m',
+
+            # Engagement
+            'total_views', 'total_saves', 'total_contact_reveals', 'is_saved',
 
             # Building details
             'specific_floor', 'total_floors', 'facing', 'facing_display', 
@@ -60,6 +199,7 @@ class PropertySerializer(serializers.ModelSerializer):
             'has_power_backup', 'has_lift', 'has_swimming_pool', 'has_club_house',
             'has_gym', 'has_park', 'has_reserved_parking', 'has_security',
             'is_vastu_compliant', 'has_intercom', 'has_piped_gas', 'has_wifi',
+            'amenities',
 
             # Media & Contact
             'images', 'video_url', 'floor_plan', 'floor_plans', 'whatsapp_number', 
@@ -174,20 +314,52 @@ class PropertySerializer(serializers.ModelSerializer):
     def get_has_mojani(self, obj):
         return bool(obj.mojani_nakasha)
 
-    def get_has_active_mandate(self, obj):
+    def _active_mandate_pk(self, obj):
+        # Prefer the annotation from Property.objects.with_active_mandate()
+        if hasattr(obj, 'active_mandate_pk'):
+            return obj.active_mandate_pk
+
         from apps.mandates.models import Mandate
-        return Mandate.objects.filter(
+        obj.active_mandate_pk = Mandate.objects.filter(
             property_item=obj, 
-            status__in=['ACTIVE', 'PENDING']
-        ).exists()
+            status__in=Mandate.OPEN_STATUSES
+        ).values_list('id', flat=True).first()
+        return obj.active_mandate_pk
+
+    def get_has_active_mandate(self, obj):
+        return self._active_mandate_pk(obj) is not None
 
     def get_active_mandate_id(self, obj):
-        from apps.mandates.models import Mandate
-        mandate = Mandate.objects.filter(
-            property_item=obj, 
-            status__in=['ACTIVE', 'PENDING']
-        ).first()
-        return str(mandate.id) if mandate else None
+        pk = self._active_mandate_pk(obj)
+        return str(pk) if pk else None
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            self._attach_uploads(validated_data)
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            self._attach_uploads(validated_data)
+            return super().update(instance, validated_data)
+
+    def _attach_uploads(self, validated_data):
+        """Swaps chunked uploads for their stored file names, marking them ATTACHED."""
+        attached = {name: value for name, value in validated_data.items() if isinstance(value, ChunkedUpload)}
+        if not attached:
+            return
+
+        upload_ids = {upload.pk for upload in attached.values()}
+        # Claimed atomically, so one upload can't end up on two listings
+        claimed = ChunkedUpload.objects.filter(pk__in=upload_ids, status='COMPLETE').update(status='ATTACHED')
+        if claimed != len(upload_ids):
+            raise serializers.ValidationError({
+                name: "This upload was already attached." for name in attached
+            })
+        for name, upload in attached.items():
+            validated_data[name] = upload.file.name
+        # The listing's post_save retains each file before this commits, so nothing is deleted
+        media.release({upload.pk: upload.file.name for upload in attached.values()}.values())
 
     def to_representation(self, instance):
         """
@@ -196,13 +368,155 @@ class PropertySerializer(serializers.ModelSerializer):
         ret = super().to_representation(instance)
         
         # Fallback for WhatsApp number: specific -> owner's phone
-        if not ret.get('whatsapp_number') and instance.owner:
+        if 'whatsapp_number' in ret and not ret['whatsapp_number'] and instance.owner:
             ret['whatsapp_number'] = instance.owner.phone_number
             
         return ret
 
+class PropertyCardSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Compact listing-card representation for search grids (?view=card).
+    Returns a single cover image instead of the gallery, floor plans and documents.
+    Expects the queryset from Property.objects.for_cards().
+    """
+    property_type_display = serializers.CharField(source='get_property_type_display', read_only=True)
+    thumbnail = serializers.SerializerMethodField()
+    image_count = serializers.SerializerMethodField()
+    has_7_12 = serializers.SerializerMethodField()
+    has_mojani = serializers.SerializerMethodField()
+    amenities = serializers.ListField(child=serializers.CharField(), read_only=True)
+    distance_m = serializers.IntegerField(read_only=True)
+    total_views = serializers.IntegerField(read_only=True)
+    total_saves = serializers.IntegerField(read_only=True)
+    total_contact_reveals = serializers.IntegerField(read_only=True)
+    is_saved = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Property
+        fields = [
+            'id', 'title', 'listing_type', 'property_type', 'property_type_display', 'sub_type',
+            'bhk_config', 'bathrooms', 'carpet_area', 'super_builtup_area', 'plot_area',
+            'total_price', 'address_line', 'locality', 'city', 'latitude', 'longitude', 'distance_m',
+            'availability_status', 'verification_status', 'is_featured', 'listed_by', 'amenities',
+            'has_7_12', 'has_mojani', 'thumbnail', 'image_count', 'created_at',
+            'total_views', 'total_saves', 'total_contact_reveals', 'is_saved',
+        ]
+        read_only_fields = fields
+
+    def get_thumbnail(self, obj):
+        # for_cards() prefetches images with the is_thumbnail one first
+        images = obj.images.all()
+        if not images:
+            return None
+        return PropertyImageSerializer(images[0], context=self.context).data
+
+    def get_image_count(self, obj):
+        return len(obj.images.all())
+
+    def get_has_7_12(self, obj):
+        return bool(obj.doc_7_12_or_pr_card)
+
+    def get_has_mojani(self, obj):
+        return bool(obj.mojani_nakasha)
+
+class PropertyImportRowSerializer(PropertySerializer):
+    """
+    Validates one bulk import row with the PropertySerializer rules.
+    File columns and `images` hold paths inside the uploaded media zip
+    (context['media_names']) instead of uploaded files.
+    """
+    images = serializers.ListField(child=serializers.CharField(), required=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in Property.FILE_FIELDS:
+            fields[name] = serializers.CharField(required=False, allow_blank=True)
+        return fields
+
+    def validate(self, data):
+        data = super().validate(data)
+        media_names = self.context.get('media_names', set())
+
+        errors = {}
+        for name in Property.FILE_FIELDS:
+            path = data.get(name)
+            if path and path not in media_names:
+                errors[name] = f"'{path}' is not in the media archive."
+        missing = [path for path in data.get('images', []) if path not in media_names]
+        if missing:
+            errors['images'] = [f"'{path}' is not in the media archive." for path in missing]
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    max_chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChunkedUpload
+        fields = [
+            'id', 'filename', 'size', 'received', 'status', 'sha256', 'max_chunk_size',
+            'created_at', 'completed_at',
+        ]
+        read_only_fields = ['id', 'received', 'status', 'sha256', 'created_at', 'completed_at']
+
+    def validate_size(self, value):
+        if value <= 0 or value > uploads.MAX_UPLOAD_SIZE:
+            raise serializers.ValidationError(f"Size must be between 1 and {uploads.MAX_UPLOAD_SIZE} bytes.")
+        return value
+
+    def get_max_chunk_size(self, obj):
+        return uploads.MAX_CHUNK_SIZE
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    """`params` takes the query parameters of /api/properties/, e.g. {"city": "Pune", "max_price": 8000000}."""
+
+    class Meta:
+        model = SavedSearch
+        fields = ['id', 'name', 'params', 'frequency', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+    def validate_params(self, value):
+        if not isinstance(value, dict) or not value:
+            raise serializers.ValidationError("Provide the search parameters as an object.")
+        try:
+            return saved_searches.normalize_params(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(exc.args[0])
+
+    def validate(self, attrs):
+        user = self.context['request'].user
+        if self.instance is None and user.saved_searches.count() >= saved_searches.MAX_SAVED_SEARCHES:
+            raise serializers.ValidationError(f"You can keep at most {saved_searches.MAX_SAVED_SEARCHES} saved searches.")
+        return attrs
+
+class PropertyImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PropertyImport
+        fields = [
+            'id', 'source_name', 'status', 'total_rows', 'created_count',
+            'errors', 'created_at', 'completed_at',
+        ]
+        read_only_fields = fields
+
 class AdminPropertySerializer(PropertySerializer):
     """
     Serializer for Admin access, including full owner details (contact info).
     """
     owner_details = UserSerializer(source='owner', read_only=True)
+    # Probable duplicates flagged at submission (apps/properties/duplicates.py)
+    possible_duplicates = serializers.SerializerMethodField()
+
+    class Meta(PropertySerializer.Meta):
+        fields = PropertySerializer.Meta.fields + ['possible_duplicates']
+
+    def get_possible_duplicates(self, obj):
+        return [
+            {
+                'id': str(flag.duplicate_of_id), 'title': flag.duplicate_of.title,
+                'verification_status': flag.duplicate_of.verification_status,
+                'score': flag.score, 'components': flag.components,
+            }
+            for flag in obj.duplicate_flags.all()
+        ]
@@ -1,3 +1,334 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.users.models import User
+from . import deletions, duplicates, market, media, saved_searches, uploads
+from .models import ChunkedUpload, LocalityPriceStats, MediaBlob, Property, SavedSearch, SavedSearchMatch
+
+SEED_ROWS = int(os.environ.get('PROPERTY_PLAN_TEST_ROWS', 30000))
+SEED_OWNERS = 20
+SEED_CITIES = ['Pune', 'Mumbai', 'Nashik', 'Nagpur', 'Aurangabad', 'Thane', 'Kolhapur', 'Solapur']
+
+
+class PropertyQueryPlanTests(TestCase):
+    """
+    Plan regression checks for the listing queries.
+
+    Seeds a large table (PROPERTY_PLAN_TEST_ROWS, default 30k), runs ANALYZE
+    and asserts via EXPLAIN that the list endpoints are served by their
+    indexes instead of sequential scans. Run with:
+        python manage.py test apps.properties
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owners = User.objects.bulk_create([
+            User(
+                email=f'owner{i}@example.com', username=f'owner{i}', password='!',
+                first_name='Seed', last_name=str(i), phone_number=f'90000{i:05d}',
+            )
+            for i in range(SEED_OWNERS)
+        ])
+        cls.owner = cls.owners[0]
+        prototype = Property.objects.create(
+            owner=cls.owner, title='Prototype', property_type='FLAT',
+            total_price=5000000, address_line='Seed Road', locality='Seed Nagar',
+            city='Pune', verification_status='VERIFIED',
+        )
+        cls._seed(prototype, SEED_ROWS)
+
+    @classmethod
+    def _seed(cls, prototype, rows):
+        """Copies the prototype `rows` times in one INSERT ... SELECT."""
+        property_types = [value for value, _ in Property.PROPERTY_TYPE_CHOICES]
+        overrides = {
+            'id': 'gen_random_uuid()',
+            'owner_id': 'owners[1 + g %% cardinality(owners)]',
+            'title': "'Listing ' || g",
+            'city': 'cities[1 + g %% cardinality(cities)]',
+            'property_type': 'types[1 + (g / 7) %% cardinality(types)]',
+            'total_price': '500000 + (g * 7919) %% 50000000',
+            'verification_status': "CASE WHEN g %% 10 = 0 THEN 'PENDING' ELSE 'VERIFIED' END",
+            'created_at': "now() - g * interval '1 minute'",
+        }
+        fields = Property._meta.concrete_fields
+        columns = ', '.join(connection.ops.quote_name(f.column) for f in fields)
+        values = ', '.join(overrides.get(f.column, f'p.{connection.ops.quote_name(f.column)}') for f in fields)
+        table = Property._meta.db_table
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) '
+                f'SELECT {values} FROM {table} p, generate_series(1, %s) g, '
+                f'(SELECT %s::uuid[] AS owners, %s::varchar[] AS cities, %s::varchar[] AS types) seed '
+                f'WHERE p.id = %s',
+                [rows, [o.pk for o in cls.owners], SEED_CITIES, property_types, prototype.pk],
+            )
+            cursor.execute(f'ANALYZE {table}')
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME='localhost')
+
+    def explain_request(self, url, user=None):
+        """EXPLAIN output for the property query behind a GET request."""
+        if user:
+            self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        sql = next(q['sql'] for q in queries.captured_queries if 'LIMIT' in q['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN {sql}')
+            return '\n'.join(row[0] for row in cursor.fetchall())
+
+    def assertIndexScan(self, plan, *indexes):
+        self.assertNotIn(f'Seq Scan on {Property._meta.db_table}', plan)
+        for index in indexes:
+            self.assertIn(index, plan)
+
+    def test_public_feed_uses_verified_index(self):
+        plan = self.explain_request('/api/properties/?page_size=20')
+        self.assertIndexScan(plan, 'property_verified_recent_idx')
+
+    def test_public_price_order_uses_price_index(self):
+        plan = self.explain_request('/api/properties/?page_size=20&ordering=total_price')
+        self.assertIndexScan(plan, 'property_verified_price_idx')
+
+    def test_public_filters_use_search_index(self):
+        plan = self.explain_request(
+            '/api/properties/?page_size=20&city=Pune&property_type=FLAT'
+            '&min_price=5000000&max_price=8000000'
+        )
+        self.assertIndexScan(plan, 'property_verified_type_idx')
+        # Both keys narrow the scan; city (icontains) is only a filter
+        cond = next(line for line in plan.splitlines() if 'Index Cond' in line)
+        self.assertIn('property_type', cond)
+        self.assertIn('total_price', cond)
+
+    def test_owner_feed_merges_index_scans(self):
+        plan = self.explain_request('/api/properties/?page_size=20', user=self.owner)
+        self.assertIndexScan(plan, 'Merge Append', 'property_verified_recent_idx')
+
+    def test_owner_feed_matches_visibility_filter(self):
+        self.client.force_authenticate(self.owner)
+        url = '/api/properties/?page_size=50'
+        seen = []
+        for _ in range(3):
+            data = self.client.get(url).json()
+            seen += [row['id'] for row in data['results']]
+            url = data['next']
+
+        expected = Property.objects.filter(
+            Q(verification_status='VERIFIED') | Q(owner=self.owner)
+        ).order_by('-created_at', '-pk').values_list('pk', flat=True)[:len(seen)]
+        self.assertEqual(seen, [str(pk) for pk in expected])
+
+    def test_my_listings_uses_owner_index(self):
+        plan = self.explain_request('/api/properties/my_listings/?page_size=20', user=self.owner)
+        self.assertIndexScan(plan, 'property_owner_recent_idx')
+
+
+class LocalityPriceStatsTests(TestCase):
+    """The incrementally maintained rollup agrees with a full rebuild."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(
+            email='rollup@example.com', username='rollup', password='!',
+            first_name='Rollup', last_name='Owner', phone_number='9100000000',
+        )
+
+    def test_price_edit_within_bucket_updates_price_sum(self):
+        listing = Property.objects.create(
+            owner=self.owner, title='Rollup', property_type='FLAT', total_price=5000000,
+            super_builtup_area=1000, address_line='Rollup Road', locality='Baner',
+            city='Pune', verification_status='VERIFIED',
+        )
+        # Same price and price-per-sqft buckets, so only count / price_sum can move
+        listing.total_price = 5200000
+        listing.save()
+
+        row = LocalityPriceStats.objects.get()
+        self.assertEqual(row.count, 1)
+        self.assertEqual(row.price_sum, 5200000)
+
+        incremental = list(LocalityPriceStats.objects.values_list('count', 'price_sum', 'price_histogram', 'ppsf_histogram'))
+        market.rebuild()
+        rebuilt = list(LocalityPriceStats.objects.values_list('count', 'price_sum', 'price_histogram', 'ppsf_histogram'))
+        self.assertEqual(incremental, rebuilt)
+
+
+class DuplicateDetectionTests(TestCase):
+    """Candidate selection for duplicate flags (apps/properties/duplicates.py)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(
+            email='dedupe@example.com', username='dedupe', password='!',
+            first_name='Dedupe', last_name='Owner', phone_number='9100000001',
+        )
+
+    def listing(self, **fields):
+        return Property(**{
+            'owner': self.owner, 'title': 'Listing', 'property_type': 'FLAT', 'listing_type': 'SALE',
+            'total_price': 5000000, 'super_builtup_area': 1000, 'locality': 'Baner', 'city': 'Pune',
+            'latitude': 18.5590, 'longitude': 73.7800, 'verification_status': 'VERIFIED', **fields,
+        })
+
+    def test_band_match_is_scored_behind_a_crowd_of_nearby_listings(self):
+        original = self.listing(title='Original', address_line='Flat 402, Green Valley Society, Baner Road')
+        original.save()
+
+        # Newer listings around the corner, more than one branch's cap
+        crowd = []
+        for i in range(duplicates.MAX_CANDIDATES + 10):
+            neighbour = self.listing(
+                title=f'Neighbour {i}', address_line=f'{chr(65 + i % 26)}{i} Sky Towers, Pashan Link {i * 37}',
+                latitude=18.5590 + (i % 10) * 0.0002, longitude=73.7800 + (i // 10) * 0.0002,
+            )
+            neighbour.compute_derived_fields()
+            crowd.append(neighbour)
+        Property.objects.bulk_create(crowd)
+
+        # Same flat, listed by a broker at a slightly different pin
+        copy = self.listing(
+            title='Copy', address_line='Flat 402 Green Valley Soc, Baner Rd', latitude=18.5592, longitude=73.7801,
+        )
+        copy.save()
+
+        self.assertIn(original.pk, [other.pk for other in duplicates.candidates(copy)])
+        self.assertEqual([flag.duplicate_of_id for flag in copy.duplicate_flags.all()], [original.pk])
+        self.assertEqual([flag.duplicate_of_id for flag in original.duplicate_flags.all()], [copy.pk])
+
+    def test_spatial_candidates_stay_within_far_metres(self):
+        prop = self.listing(title='Centre', address_line='Plot 7, Lake View Layout')
+        prop.save()
+        # Over a kilometre east, yet inside the covering geohash cells
+        far = self.listing(title='Far', address_line='Shop 3, Market Yard', longitude=73.7800 + 0.012)
+        far.save()
+        near = self.listing(title='Near', address_line='Shop 9, Hill Road', latitude=18.5590 + 0.003)
+        near.save()
+
+        pks = [other.pk for other in duplicates.candidates(prop)]
+        self.assertIn(near.pk, pks)
+        self.assertNotIn(far.pk, pks)
+
+
+class SavedSearchMatchingTests(TestCase):
+    """Saved-search alerts agree with re-running the search (apps/properties/saved_searches.py)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner, cls.buyer = User.objects.bulk_create([
+            User(email=f'{name}@example.com', username=name, password='!', first_name=name.title(),
+                 last_name='User', phone_number=f'91000000{i:02d}')
+            for i, name in enumerate(['seller', 'buyer'], start=10)
+        ])
+
+    def test_city_matches_like_the_search_filter(self):
+        listing = Property.objects.create(
+            owner=self.owner, title='Riverside', property_type='FLAT', total_price=5000000,
+            address_line='Riverside Road', locality='Aundh', city='New Pune City', verification_status='VERIFIED',
+        )
+        cities = ['Pune', 'pun', 'New Pune City', 'Mumbai']
+        for city in cities:
+            SavedSearch.objects.create(user=self.buyer, name=city, params={'city': city})
+
+        self.assertEqual(saved_searches.notify_matches([listing.pk]), 3)
+        matched = set(SavedSearchMatch.objects.values_list('search__name', flat=True))
+        self.assertEqual(matched, {'Pune', 'pun', 'New Pune City'})
+        for city in cities:
+            found = APIClient(SERVER_NAME='localhost').get('/api/properties/', {'city': city, 'page_size': 20}).json()['results']
+            self.assertEqual(city in matched, str(listing.pk) in [row['id'] for row in found])
+
+
+class MediaReferenceCountTests(TestCase):
+    """Reference counting of the shared, content-addressed documents (apps/properties/media.py)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(
+            email='docs@example.com', username='docs', password='!',
+            first_name='Docs', last_name='Owner', phone_number='9100000002',
+        )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Queued deletions run here instead of in a thread, which couldn't see the test's transaction
+        patcher = mock.patch.object(deletions, 'process_in_background', deletions.process)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def listing(self, **documents):
+        return Property.objects.create(
+            owner=self.owner, title='Plot', property_type='PLOT', total_price=2500000,
+            address_line='Survey 12', locality='Wagholi', city='Pune', **documents,
+        )
+
+    def blob(self, name):
+        return MediaBlob.objects.filter(name=name).first()
+
+    def test_shared_document_survives_deleting_one_listing(self):
+        first = self.listing(layout_order=ContentFile(b'layout sanction', name='layout.pdf'))
+        second = self.listing(layout_order=ContentFile(b'layout sanction', name='copy.pdf'))
+        name = first.layout_order.name
+        self.assertEqual(second.layout_order.name, name)
+        self.assertEqual(self.blob(name).ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.blob(name).ref_count, 1)
+        self.assertTrue(media.document_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertIsNone(self.blob(name))
+        self.assertFalse(media.document_storage.exists(name))
+
+    def test_replacing_a_document_releases_the_old_one(self):
+        listing = self.listing(layout_order=ContentFile(b'old layout', name='layout.pdf'))
+        old = listing.layout_order.name
+
+        listing.layout_order = ContentFile(b'new layout', name='layout.pdf')
+        with self.captureOnCommitCallbacks(execute=True):
+            listing.save()
+        new = listing.layout_order.name
+
+        self.assertNotEqual(new, old)
+        self.assertEqual(self.blob(new).ref_count, 1)
+        self.assertIsNone(self.blob(old))
+        self.assertFalse(media.document_storage.exists(old))
+
+    def test_attached_chunked_upload_is_counted_once(self):
+        content = b'7/12 extract ' * 100
+        upload = ChunkedUpload.objects.create(owner=self.owner, filename='extract.pdf', size=len(content))
+        uploads.write_chunk(upload, 0, len(content), io.BytesIO(content))
+        uploads.complete(upload)
+        self.assertEqual(self.blob(upload.file.name).ref_count, 1)
+
+        listing = self.listing()
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(self.owner)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch(f'/api/properties/{listing.pk}/', {'doc_7_12_or_pr_card': str(upload.pk)})
+        self.assertEqual(response.status_code, 200, response.content)
+
+        listing.refresh_from_db()
+        self.assertEqual(listing.doc_7_12_or_pr_card.name, upload.file.name)
+        self.assertEqual(self.blob(upload.file.name).ref_count, 1)
+        self.assertTrue(media.document_storage.exists(upload.file.name))
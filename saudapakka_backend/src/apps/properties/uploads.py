@@ -0,0 +1,126 @@
+"""
+Resumable chunked uploads for the legal documents.
+
+A client starts an upload with the file name and total size. It then PUTs
+the bytes in order, each chunk with a `Content-Range: bytes <start>-<end>/<total>`
+header. If the connection drops, GET tells it how many bytes arrived, and
+it carries on from there. Chunks are streamed straight into a part file
+under CHUNKED_UPLOAD_DIR, so no request body is held in memory or goes
+over nginx's body limit. complete() checks the size (and the SHA-256, if
+given) and moves the part file into storage. The create/update request
+then passes the upload id in place of the file (UploadedFileField).
+"""
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from . import media
+
+MAX_UPLOAD_SIZE = getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 100 * 1024 * 1024)
+# Comfortably below nginx's client_max_body_size
+MAX_CHUNK_SIZE = 8 * 1024 * 1024
+READ_BLOCK_SIZE = 64 * 1024
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadError(ValueError):
+    """A chunk or completion request that doesn't fit the upload's state."""
+
+
+class _PartFile(File):
+    # FileSystemStorage moves files exposing temporary_file_path() instead of copying them
+    def temporary_file_path(self):
+        return self.name
+
+
+def part_path(upload):
+    directory = getattr(settings, 'CHUNKED_UPLOAD_DIR', os.path.join(settings.MEDIA_ROOT, 'partial_uploads'))
+    return os.path.join(directory, f'{upload.pk}.part')
+
+
+def parse_content_range(header, upload):
+    """(start, length) from a Content-Range header, checked against the upload."""
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise UploadError("Send a 'Content-Range: bytes <start>-<end>/<total>' header.")
+    start, end, total = (int(value) for value in match.groups())
+    if total != upload.size or end < start or end >= total:
+        raise UploadError(f"Invalid range for an upload of {upload.size} bytes.")
+    length = end - start + 1
+    if length > MAX_CHUNK_SIZE:
+        raise UploadError(f"Chunks can be at most {MAX_CHUNK_SIZE} bytes.")
+    return start, length
+
+
+def write_chunk(upload, start, length, stream):
+    """
+    Appends `length` bytes from `stream` at offset `start`, which must be
+    where the previous chunk ended. The caller holds a row lock on `upload`.
+    """
+    if upload.status != 'UPLOADING':
+        raise UploadError("This upload is already complete.")
+    if start != upload.received:
+        raise UploadError(f"Expected the chunk starting at byte {upload.received}.")
+
+    path = part_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    written = 0
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as part:
+        # A chunk that failed halfway may have left bytes past `received`
+        part.seek(start)
+        part.truncate()
+        while written < length:
+            block = stream.read(min(READ_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            part.write(block)
+            written += len(block)
+
+    if written != length:
+        raise UploadError(f"Expected {length} bytes but received {written}; resend the chunk.")
+    upload.received += written
+    upload.save(update_fields=['received'])
+
+
+def complete(upload, sha256=''):
+    """Verifies the assembled file and moves it into storage."""
+    if upload.status != 'UPLOADING':
+        raise UploadError("This upload is already complete.")
+    if upload.received != upload.size:
+        raise UploadError(f"Only {upload.received} of {upload.size} bytes have been received.")
+
+    path = part_path(upload)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as part:
+        for block in iter(lambda: part.read(READ_BLOCK_SIZE), b''):
+            digest.update(block)
+    if sha256 and sha256.lower() != digest.hexdigest():
+        os.remove(path)
+        upload.received = 0
+        upload.save(update_fields=['received'])
+        raise UploadError("Checksum mismatch; the upload was reset, send it again from byte 0.")
+
+    with open(path, 'rb') as part:
+        upload.file.save(os.path.basename(upload.filename), _PartFile(part, name=path), save=False)
+    # Left behind when the same document was already stored
+    if os.path.exists(path):
+        os.remove(path)
+    upload.sha256 = digest.hexdigest()
+    upload.status = 'COMPLETE'
+    upload.completed_at = timezone.now()
+    upload.save()
+
+
+def discard(upload):
+    """Deletes an unused upload together with its part file, releasing its stored file."""
+    path = part_path(upload)
+    if os.path.exists(path):
+        os.remove(path)
+    if upload.file and upload.status != 'ATTACHED':
+        media.release([upload.file.name])
+    upload.delete()
@@ -1,10 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PropertyViewSet
+from .views import PropertyViewSet, ChunkedUploadViewSet, SavedSearchViewSet, LocalityMarketView
 
 router = DefaultRouter()
+# Before 'properties', whose detail route would otherwise take 'uploads' as a pk
+router.register(r'properties/uploads', ChunkedUploadViewSet, basename='chunked-upload')
+router.register(r'properties/saved-searches', SavedSearchViewSet, basename='saved-search')
 router.register(r'properties', PropertyViewSet, basename='property')
 
 urlpatterns = [
+    path('market/localities/', LocalityMarketView.as_view(), name='market-localities'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,17 +1,42 @@
-from rest_framework import viewsets, permissions, status, filters, exceptions
+import io
+import uuid
+
+from rest_framework import viewsets, mixins, permissions, status, exceptions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, F, Count, Avg, Min, Max
+from django.db.models.functions import Substr
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 import django_filters
 
-from .models import Property, PropertyImage, SavedProperty, RecentlyViewed
-from .serializers import PropertySerializer, PropertyImageSerializer
+from .models import (
+    Property, PropertyImage, PropertyImport, ChunkedUpload, SavedProperty, SavedSearch, LocalityPriceStats,
+    AMENITY_BITS, amenity_mask_for,
+)
+from .serializers import (
+    PropertySerializer, PropertyCardSerializer, PropertyImageSerializer, PropertyImageBatchSerializer,
+    PropertyImportSerializer, ChunkedUploadSerializer, SavedSearchSerializer,
+)
 from .permissions import IsOwnerOrReadOnly
+from .pagination import PropertyKeysetPagination
+from .search import PropertySearchFilter, PropertyOrderingFilter
+from .cache import cached_listing_response, bump_listing_generation_on_commit
+from .facets import facet_counts
+from . import activity, geo, embeddings, imports, market, uploads, images as image_variants
+from pgvector.django import L2Distance
 
 # --- ADVANCED FILTERING LOGIC ---
 
+class NumberCSVFilter(django_filters.BaseCSVFilter, django_filters.NumberFilter):
+    """Comma separated list of numbers, e.g. near=19.87,75.34"""
+    pass
+
 class PropertyFilter(django_filters.FilterSet):
     # Professional Price Range Filters
     min_price = django_filters.NumberFilter(field_name="total_price", lookup_expr='gte')
@@ -23,6 +48,19 @@ class PropertyFilter(django_filters.FilterSet):
     # Exact Match Filters
     city = django_filters.CharFilter(field_name="city", lookup_expr='icontains')
     bhk = django_filters.NumberFilter(field_name="bhk_config")
+
+    # Geo Filters
+    # near=<lat>,<lng>&radius_km=5 -> listings within the circle, nearest first
+    # bbox=<min_lng>,<min_lat>,<max_lng>,<max_lat> -> listings inside the map viewport
+    near = NumberCSVFilter(method='filter_near')
+    radius_km = django_filters.NumberFilter(method='filter_radius_km')
+    bbox = NumberCSVFilter(method='filter_bbox')
+
+    # Must-have amenities: amenities=lift,gym,security (names from models.AMENITY_FIELDS)
+    amenities = django_filters.CharFilter(method='filter_amenities')
+
+    DEFAULT_RADIUS_KM = 5
+    MAX_RADIUS_KM = 100
     
     class Meta:
         model = Property
@@ -31,17 +69,72 @@ class PropertyFilter(django_filters.FilterSet):
             'furnishing_status', 'availability_status', 'facing'
         ]
 
+    def filter_amenities(self, queryset, name, value):
+        names = [n.strip() for n in value.split(',') if n.strip()]
+        unknown = [n for n in names if n not in AMENITY_BITS]
+        if unknown:
+            raise exceptions.ValidationError({
+                "amenities": f"Unknown amenities {unknown}. Valid choices are: {list(AMENITY_BITS)}"
+            })
+
+        # Single predicate: (amenity_mask & required) = required
+        required = amenity_mask_for(names)
+        return queryset.alias(
+            matched_amenities=F('amenity_mask').bitand(required)
+        ).filter(matched_amenities=required)
+
+    def filter_radius_km(self, queryset, name, value):
+        # Consumed by filter_near
+        return queryset
+
+    def filter_near(self, queryset, name, value):
+        if len(value) != 2:
+            raise exceptions.ValidationError({"near": "Use near=<latitude>,<longitude>."})
+        lat, lng = float(value[0]), float(value[1])
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise exceptions.ValidationError({"near": "Coordinates out of range."})
+
+        radius_km = self.form.cleaned_data.get('radius_km') or self.DEFAULT_RADIUS_KM
+        radius_km = min(max(float(radius_km), 0.1), self.MAX_RADIUS_KM)
+
+        # Cheap index prefilter (geohash cells + bounding box), then exact distance
+        cells = Q()
+        for prefix in geo.covering_prefixes(lat, lng, radius_km):
+            cells |= Q(geohash__startswith=prefix)
+        min_lat, min_lng, max_lat, max_lng = geo.bounding_box(lat, lng, radius_km)
+
+        return queryset.filter(
+            cells,
+            latitude__range=(min_lat, max_lat),
+            longitude__range=(min_lng, max_lng),
+        ).annotate(
+            distance_m=geo.distance_expression(lat, lng)
+        ).filter(distance_m__lte=radius_km * 1000)
+
+    def filter_bbox(self, queryset, name, value):
+        if len(value) != 4:
+            raise exceptions.ValidationError({"bbox": "Use bbox=<min_lng>,<min_lat>,<max_lng>,<max_lat>."})
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in value)
+        if min_lat > max_lat or min_lng > max_lng:
+            raise exceptions.ValidationError({"bbox": "Minimum corner must come before maximum corner."})
+
+        return queryset.filter(
+            latitude__range=(min_lat, max_lat),
+            longitude__range=(min_lng, max_lng),
+        )
+
 # --- MAIN VIEWSET ---
 
 class PropertyViewSet(viewsets.ModelViewSet):
     serializer_class = PropertySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     parser_classes = [MultiPartParser, FormParser] 
+    pagination_class = PropertyKeysetPagination
     
     # Filtering & Search Configuration
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # search= runs against the weighted Property.search_vector (see models.SEARCH_WEIGHTS)
+    filter_backends = [DjangoFilterBackend, PropertySearchFilter, PropertyOrderingFilter]
     filterset_class = PropertyFilter
-    search_fields = ['title', 'project_name', 'address_line', 'locality', 'city', 'landmarks']
     ordering_fields = ['total_price', 'created_at', 'super_builtup_area']
 
     def get_queryset(self):
@@ -51,19 +144,49 @@ class PropertyViewSet(viewsets.ModelViewSet):
         2. Owners: Verified + Their Own (Pending/Rejected).
         3. Public: Verified Only.
         """
-        user = self.request.user
-        base_query = Property.objects.all().prefetch_related('images').select_related('owner')
+        return self.get_base_queryset().visible_to(self.request.user).order_by('-created_at')
 
-        if user.is_staff:
-            return base_query.order_by('-created_at')
-        
-        # Public & Authenticated Users: Only show VERIFIED properties or their own properties
-        if user.is_authenticated:
-            return base_query.filter(
-                Q(verification_status='VERIFIED') | Q(owner=user)
-            ).order_by('-created_at').distinct()
-            
-        return base_query.filter(verification_status='VERIFIED').order_by('-created_at')
+    # Actions that can answer with compact listing cards (?view=card)
+    card_actions = ['list', 'my_saved', 'my_recent', 'my_listings']
+
+    def get_serializer_class(self):
+        if self.action in self.card_actions and self.request.query_params.get('view') == 'card':
+            return PropertyCardSerializer
+        return super().get_serializer_class()
+
+    def get_base_queryset(self):
+        """Unfiltered queryset with exactly the prefetches the response needs."""
+        # Aggregate-only actions skip the serializer prefetches and annotations
+        if self.action in ('clusters', 'facets'):
+            return Property.objects.all()
+        if self.get_serializer_class() is PropertyCardSerializer:
+            queryset = Property.objects.for_cards()
+        else:
+            queryset = Property.objects.for_listing()
+        return queryset.with_saved(self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        property_obj = self.get_object()
+        # Owners checking their own listing aren't views
+        if property_obj.owner_id != request.user.pk:
+            activity.count_view(property_obj.pk)
+        return Response(self.get_serializer(property_obj).data)
+
+    def list(self, request, *args, **kwargs):
+        # Anonymous search traffic is served from the versioned listing cache
+        return cached_listing_response(
+            request, 'list', lambda: super(PropertyViewSet, self).list(request, *args, **kwargs)
+        )
+
+    def _list_response(self, queryset):
+        """Serializes a queryset, paginating it when the client asks for a page."""
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
 
     def _check_kyc_required(self, user):
         """
@@ -82,9 +205,8 @@ class PropertyViewSet(viewsets.ModelViewSet):
         # Check cached KYC status (no DB query!)
         return not user.is_kyc_verified
     
-    def perform_create(self, serializer):
-        user = self.request.user
-        
+    def _check_can_list(self, user):
+        """Raises PermissionDenied unless `user` may create listings."""
         # KYC Verification Check
         if self._check_kyc_required(user):
             raise exceptions.PermissionDenied(
@@ -93,9 +215,13 @@ class PropertyViewSet(viewsets.ModelViewSet):
         
         # Check User Authorization
         if not user.is_staff and not (user.is_active_seller or user.is_active_broker):
-            raise permissions.PermissionDenied(
+            raise exceptions.PermissionDenied(
                 "Access Denied: You must be a seller or broker to list properties."
             )
+
+    def perform_create(self, serializer):
+        user = self.request.user
+        self._check_can_list(user)
         
         # Save with owner and initial pending status
         property_instance = serializer.save(owner=user, verification_status='PENDING')
@@ -111,6 +237,61 @@ class PropertyViewSet(viewsets.ModelViewSet):
                     order=i
                 )
 
+    # --- BULK IMPORT ---
+
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[permissions.IsAuthenticated])
+    def bulk_import(self, request):
+        """
+        Creates one PENDING listing per row of a CSV/XLSX sheet.
+        Usage: POST /api/properties/import/ (multipart)
+            file:    .csv or .xlsx, one listing per row, columns named like the property fields
+            media:   optional .zip holding the images/documents the rows reference by path
+            dry_run: 'true' to validate without creating anything
+        Returns the per-row error report. Media is attached in the background;
+        poll /api/properties/imports/<id>/ until status is COMPLETED.
+        """
+        user = request.user
+        self._check_can_list(user)
+
+        source = request.FILES.get('file')
+        if not source:
+            return Response({"error": "file is required."}, status=400)
+        media = request.FILES.get('media')
+        context = self.get_serializer_context()
+
+        try:
+            if str(request.data.get('dry_run', '')).lower() in ('true', '1'):
+                media_names = imports.archive_names(media) if media else set()
+                importer = imports.PropertyImporter(user, media_names, context=context, dry_run=True)
+                importer.run(imports.read_rows(source, source.name))
+                return Response({'dry_run': True, **importer.report()})
+
+            job = imports.run_import(user, source, source.name, media=media, context=context)
+        except imports.ImportFileError as e:
+            return Response({"error": str(e)}, status=400)
+
+        if job.status == 'PROCESSING_MEDIA':
+            imports.attach_media_in_background(job)
+        return Response(PropertyImportSerializer(job).data, status=201)
+
+    @action(detail=False, methods=['get'], url_path='imports', permission_classes=[permissions.IsAuthenticated])
+    def my_imports(self, request):
+        """The user's bulk imports, newest first."""
+        jobs = PropertyImport.objects.filter(owner=request.user)
+        return Response(PropertyImportSerializer(jobs[:50], many=True).data)
+
+    @action(
+        detail=False, methods=['get'], url_path=r'imports/(?P<import_id>\d+)',
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def import_status(self, request, import_id=None):
+        """Progress and per-row error report of one bulk import."""
+        jobs = PropertyImport.objects.all()
+        if not request.user.is_staff:
+            jobs = jobs.filter(owner=request.user)
+        job = get_object_or_404(jobs, pk=import_id)
+        return Response(PropertyImportSerializer(job).data)
+
     # --- IMAGE MANAGEMENT ---
 
     @action(detail=True, methods=['post'], url_path='upload_image')
@@ -129,6 +310,129 @@ class PropertyViewSet(viewsets.ModelViewSet):
             
         return Response(serializer.errors, status=400)
 
+    @action(detail=True, methods=['post'], url_path='upload_images')
+    def upload_images(self, request, pk=None):
+        """
+        Adds several gallery images in one multipart request.
+        Usage: POST /api/properties/{id}/upload_images/
+            images:    one or more image files (repeat the field)
+            thumbnail: optional index of the new cover image within `images`
+            order:     optional display position per image (repeat the field)
+        """
+        property_obj = self.get_object()
+
+        if property_obj.owner != request.user and not request.user.is_staff:
+            return Response({"error": "Unauthorized"}, status=403)
+
+        serializer = PropertyImageBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        files = serializer.validated_data['images']
+        thumbnail = serializer.validated_data.get('thumbnail')
+        order = serializer.validated_data.get('order')
+
+        with transaction.atomic():
+            # Locks the listing so concurrent batches don't hand out the same positions
+            Property.objects.select_for_update().filter(pk=property_obj.pk).values_list('pk', flat=True).get()
+            gallery = PropertyImage.objects.filter(property=property_obj)
+            if order is None:
+                last = gallery.order_by('-order').values_list('order', flat=True).first()
+                start = 0 if last is None else last + 1
+                order = range(start, start + len(files))
+            if thumbnail is not None:
+                gallery.filter(is_thumbnail=True).update(is_thumbnail=False)
+            elif not gallery.filter(is_thumbnail=True).exists():
+                thumbnail = 0
+
+            # bulk_create still runs FileField.pre_save, which writes each file to storage
+            created = PropertyImage.objects.bulk_create([
+                PropertyImage(property=property_obj, image=file, order=position, is_thumbnail=index == thumbnail)
+                for index, (file, position) in enumerate(zip(files, order))
+            ])
+            # bulk_create skips post_save, which would do these two
+            bump_listing_generation_on_commit()
+            image_variants.generate_variants_in_background(PropertyImage, [image.pk for image in created])
+
+        return Response(PropertyImageSerializer(created, many=True, context={'request': request}).data, status=201)
+
+    # --- MAP ---
+
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        """
+        Pre-aggregated map markers for the visible viewport.
+        Usage: /api/properties/clusters/?bbox=<min_lng>,<min_lat>,<max_lng>,<max_lat>&zoom=12
+        Accepts every PropertyFilter / search parameter of the list endpoint and
+        groups the matches by geohash prefix in a single aggregate query.
+        """
+        if not request.query_params.get('bbox'):
+            return Response({"error": "bbox is required."}, status=400)
+        try:
+            zoom = int(request.query_params.get('zoom', ''))
+        except ValueError:
+            return Response({"error": "zoom must be an integer between 0 and 22."}, status=400)
+        if not 0 <= zoom <= 22:
+            return Response({"error": "zoom must be an integer between 0 and 22."}, status=400)
+
+        return cached_listing_response(request, 'clusters', lambda: self._clusters_response(zoom))
+
+    def _clusters_response(self, zoom):
+        precision = geo.precision_for_zoom(zoom)
+        queryset = self.filter_queryset(self.get_queryset()).exclude(geohash='')
+        clusters = queryset.order_by().values(
+            cell=Substr('geohash', 1, precision)
+        ).annotate(
+            count=Count('id'),
+            latitude=Avg('latitude'),
+            longitude=Avg('longitude'),
+            min_price=Min('total_price'),
+            max_price=Max('total_price'),
+        )
+
+        return Response({
+            "zoom": zoom,
+            "precision": precision,
+            "clusters": list(clusters),
+        })
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Counts per property type, BHK, availability, furnishing and budget band
+        for the search sidebar. Accepts the same filters as the list endpoint.
+        Usage: /api/properties/facets/?city=Pune&min_price=5000000
+        """
+        return cached_listing_response(
+            request, 'facets', lambda: Response(facet_counts(self.filter_queryset(self.get_queryset())))
+        )
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        The k verified listings closest to this one in embedding space
+        (type, BHK, price, area, amenities, location). Usage: ?k=10
+        """
+        property_obj = self.get_object()
+        return cached_listing_response(request, 'similar', lambda: self._similar_response(property_obj))
+
+    def _similar_response(self, property_obj):
+        try:
+            k = min(max(int(self.request.query_params.get('k', 10)), 1), 50)
+        except ValueError:
+            return Response({"error": "k must be an integer."}, status=400)
+
+        target = property_obj.embedding
+        if target is None:
+            target = embeddings.build_embedding(property_obj)
+
+        # ORDER BY embedding <-> target LIMIT k on verified rows -> HNSW index scan
+        similar = Property.objects.for_cards().with_saved(self.request.user).filter(
+            verification_status='VERIFIED'
+        ).exclude(pk=property_obj.pk).order_by(L2Distance('embedding', target))[:k]
+
+        serializer = PropertyCardSerializer(similar, many=True, context=self.get_serializer_context())
+        return Response(serializer.data)
+
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def get_contact_details(self, request, pk=None):
         """
@@ -141,6 +445,8 @@ class PropertyViewSet(viewsets.ModelViewSet):
         # or implement a credit system/subscription check here.
         
         owner = property_obj.owner
+        if owner.pk != request.user.pk:
+            activity.count_contact_reveal(property_obj.pk)
         contact_info = {
             "id": owner.id,
             "full_name": owner.full_name,
@@ -158,37 +464,55 @@ class PropertyViewSet(viewsets.ModelViewSet):
         saved_item, created = SavedProperty.objects.get_or_create(user=request.user, property=property_obj)
         if not created:
             saved_item.delete()
-            return Response({'message': 'Removed from saved'}, status=200)
-        return Response({'message': 'Saved successfully'}, status=201)
+            return Response({'message': 'Removed from saved', 'is_saved': False}, status=200)
+        activity.count_save(property_obj.pk)
+        return Response({'message': 'Saved successfully', 'is_saved': True}, status=201)
 
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def record_view(self, request, pk=None):
-        """Called when user opens a property. Updates the 'Recently Viewed' list."""
-        property_obj = self.get_object()
-        RecentlyViewed.objects.update_or_create(user=request.user, property=property_obj)
-        serializer = self.get_serializer(property_obj)
-        return Response(serializer.data)
+        """
+        Called when user opens a property. Updates the 'Recently Viewed' list.
+        After a primary-key check that the user may see the listing, the view
+        is buffered and written in a batch (apps/properties/activity.py), so
+        this writes nothing and returns 204.
+        """
+        try:
+            property_id = uuid.UUID(pk)
+        except ValueError:
+            raise Http404
+        if not Property.objects.visible_to(request.user).filter(pk=property_id).exists():
+            raise Http404
+        activity.record_view(request.user.pk, property_id, timezone.now())
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def my_saved(self, request):
-        saved = SavedProperty.objects.filter(user=request.user).select_related('property')
-        props = [s.property for s in saved]
-        serializer = self.get_serializer(props, many=True)
-        return Response(serializer.data)
+        """
+        Listings the current user has saved, still visible to them.
+        Usage: /api/properties/my_saved/?page_size=20&view=card
+        """
+        saved = self.get_base_queryset().visible_to(request.user).filter(
+            savedproperty__user=request.user
+        ).order_by('-created_at')
+        return self._list_response(saved)
 
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def my_recent(self, request):
-        recent = RecentlyViewed.objects.filter(user=request.user).order_by('-viewed_at')[:10]
-        props = [r.property for r in recent]
-        serializer = self.get_serializer(props, many=True)
+        # History is capped at RECENTLY_VIEWED_LIMIT rows, so this one is never paginated
+        recent = self.get_base_queryset().visible_to(request.user).filter(
+            recentlyviewed__user=request.user
+        ).order_by('-recentlyviewed__viewed_at')[:activity.RECENTLY_VIEWED_LIMIT]
+        serializer = self.get_serializer(recent, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def my_listings(self, request):
-        """Retrieve properties listed by the current user (Seller/Broker)"""
-        listings = Property.objects.filter(owner=request.user).order_by('-created_at')
-        serializer = self.get_serializer(listings, many=True)
-        return Response(serializer.data)
+        """
+        Retrieve properties listed by the current user (Seller/Broker),
+        with lifetime total_views / total_saves / total_contact_reveals.
+        """
+        listings = self.get_base_queryset().with_stats().filter(owner=request.user).order_by('-created_at')
+        return self._list_response(listings)
 
 
     
@@ -225,4 +549,115 @@ class PropertyViewSet(viewsets.ModelViewSet):
              self.perform_destroy(property_obj)
              return Response({"message": "Property deleted by authorized Broker."}, status=status.HTTP_204_NO_CONTENT)
 
-        return Response({"error": "Unauthorized: You do not have permission to delete this property."}, status=403)
\ No newline at end of file
+        return Response({"error": "Unauthorized: You do not have permission to delete this property."}, status=403)
+
+
+class SavedSearchViewSet(viewsets.ModelViewSet):
+    """
+    A user's saved searches, alerted when a matching listing goes live
+    (see apps/properties/saved_searches.py).
+        POST /api/properties/saved-searches/  {name, params: {city, property_type, min_price, ...}, frequency: INSTANT|DAILY}
+    """
+    serializer_class = SavedSearchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class ChunkedUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable uploads for large documents (see apps/properties/uploads.py).
+        POST   /api/properties/uploads/                  {filename, size} -> {id, received: 0, ...}
+        PUT    /api/properties/uploads/{id}/chunk/       raw bytes + Content-Range: bytes <start>-<end>/<size>
+        GET    /api/properties/uploads/{id}/             `received` is where to resume
+        POST   /api/properties/uploads/{id}/complete/    {sha256 (optional)}
+        DELETE /api/properties/uploads/{id}/             abandon
+    Then send the id in place of the file, e.g. title_search_report=<id>,
+    when creating or updating the property.
+    """
+    serializer_class = ChunkedUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return ChunkedUpload.objects.filter(owner=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+    def destroy(self, request, *args, **kwargs):
+        upload = self.get_object()
+        if upload.status == 'ATTACHED':
+            return Response({"error": "This upload is attached to a property."}, status=400)
+        uploads.discard(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    # Chunks are read from the raw request stream, never parsed
+    @action(detail=True, methods=['put'], parser_classes=[])
+    def chunk(self, request, pk=None):
+        with transaction.atomic():
+            upload = get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+            try:
+                start, length = uploads.parse_content_range(request.headers.get('Content-Range'), upload)
+                uploads.write_chunk(upload, start, length, request.stream or io.BytesIO())
+            except uploads.UploadError as e:
+                return Response({"error": str(e), "received": upload.received}, status=400)
+        return Response(self.get_serializer(upload).data)
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        with transaction.atomic():
+            upload = get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+            try:
+                uploads.complete(upload, request.data.get('sha256', ''))
+            except uploads.UploadError as e:
+                return Response({"error": str(e), "received": upload.received}, status=400)
+        return Response(self.get_serializer(upload).data)
+
+
+class LocalityMarketView(APIView):
+    """
+    Price levels per locality from the LocalityPriceStats rollup (see market.py):
+    listings, avg_price, median_price and price_per_sqft p25/median/p75 of the
+    verified listings created in the last `months` months, most listings first.
+    Usage: /api/market/localities/?city=Pune&property_type=FLAT&listing_type=SALE&months=12
+    """
+    permission_classes = [permissions.AllowAny]
+    MAX_MONTHS = 60
+    MAX_LOCALITIES = 200
+
+    def get(self, request):
+        return cached_listing_response(request, 'market', lambda: self._response(request))
+
+    def _response(self, request):
+        params = request.query_params
+        try:
+            months = min(max(int(params.get('months', 12)), 1), self.MAX_MONTHS)
+            limit = min(max(int(params.get('limit', 50)), 1), self.MAX_LOCALITIES)
+        except ValueError:
+            return Response({"error": "months and limit must be integers."}, status=400)
+
+        since = market.month_start(months - 1)
+        rows = LocalityPriceStats.objects.filter(
+            listing_type=params.get('listing_type', 'SALE'), month__gte=since,
+        )
+        for field in ('city', 'locality'):
+            if params.get(field):
+                rows = rows.filter(**{f'{field}__iexact': params[field].strip()})
+        if params.get('property_type'):
+            rows = rows.filter(property_type=params['property_type'])
+
+        localities = {}
+        for row in rows:
+            localities.setdefault((row.city, row.locality), []).append(row)
+        results = [
+            {'city': city, 'locality': locality, **market.summarize(group)}
+            for (city, locality), group in localities.items()
+        ]
+        results = [item for item in results if item['listings'] > 0]
+        results.sort(key=lambda item: -item['listings'])
+        return Response({'since': since, 'results': results[:limit]})
@@ -3,21 +3,23 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Property
 from .serializers import PropertySerializer
+from . import saved_searches
 
 class AdminPropertyViewSet(viewsets.ModelViewSet):
     """
     Restricted API for platform administrators to manage all listings.
     """
-    queryset = Property.objects.all().order_by('-created_at')
+    queryset = Property.objects.for_listing().order_by('-created_at')
     serializer_class = PropertySerializer
     permission_classes = [permissions.IsAdminUser] # Ensures only Staff/Superusers access this
 
     def perform_create(self, serializer):
         # Admin-created listings are auto-verified and owned by the Platform
-        serializer.save(
+        property_obj = serializer.save(
             owner=self.request.user,
             verification_status='VERIFIED'
         )
+        saved_searches.match_in_background([property_obj.pk])
 
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
@@ -25,6 +27,7 @@ class AdminPropertyViewSet(viewsets.ModelViewSet):
         property_obj = self.get_object()
         property_obj.verification_status = 'VERIFIED'
         property_obj.save()
+        saved_searches.match_in_background([property_obj.pk])
         return Response({"message": "Property approved and live."})
 
     @action(detail=True, methods=['post'])
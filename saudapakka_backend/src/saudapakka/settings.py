@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third Party
     'rest_framework',
@@ -103,6 +104,22 @@ DATABASES = {
 
 
 
+# =============================================================================
+# CACHE
+# =============================================================================
+
+# Local memory by default (per process). In production point CACHE_URL at a
+# cache shared by all gunicorn workers, e.g. dbcache://saudapakka_cache
+# (after `manage.py createcachetable`) or rediscache://redis:6379/1
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Public property listing responses (see apps/properties/cache.py)
+PROPERTY_LIST_CACHE_ALIAS = 'default'
+PROPERTY_LIST_CACHE_TIMEOUT = env.int('PROPERTY_LIST_CACHE_TIMEOUT', default=300)
+
+
 # =============================================================================
 # PASSWORD VALIDATION
 # =============================================================================